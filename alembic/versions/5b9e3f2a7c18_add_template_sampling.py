@@ -0,0 +1,34 @@
+"""Add template sampling fields
+
+Revision ID: 5b9e3f2a7c18
+Revises: d82f5a1c6e39
+Create Date: 2026-10-16 19:26:14.870215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e3f2a7c18'
+down_revision: Union[str, Sequence[str], None] = 'd82f5a1c6e39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crawl_state', sa.Column('structure_hash', sa.String(length=16), nullable=True))
+    op.add_column('audit_runs', sa.Column('sample_per_template', sa.Integer(), nullable=True))
+    op.add_column('audit_runs', sa.Column('templates', sa.JSON(), nullable=True))
+    op.add_column('audit_results', sa.Column('template_key', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('audit_results', 'template_key')
+    op.drop_column('audit_runs', 'templates')
+    op.drop_column('audit_runs', 'sample_per_template')
+    op.drop_column('crawl_state', 'structure_hash')
@@ -0,0 +1,28 @@
+"""Add canonical_url to crawl_state
+
+Revision ID: 5d21c7e0a4f3
+Revises: bae91d9c2800
+Create Date: 2026-10-16 10:03:27.114902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d21c7e0a4f3'
+down_revision: Union[str, Sequence[str], None] = 'bae91d9c2800'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crawl_state', sa.Column('canonical_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('crawl_state', 'canonical_url')
@@ -0,0 +1,49 @@
+"""Add audit runs and link audit results to them
+
+Revision ID: 6e1d8b3f4a27
+Revises: f7b3e2d91a64
+Create Date: 2026-10-16 17:12:40.218337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1d8b3f4a27'
+down_revision: Union[str, Sequence[str], None] = 'f7b3e2d91a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'audit_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('website_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('total_pages', sa.Integer(), nullable=True),
+        sa.Column('include_mobile', sa.Boolean(), nullable=True),
+        sa.Column('include_desktop', sa.Boolean(), nullable=True),
+        sa.Column('summary', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_runs_id'), 'audit_runs', ['id'], unique=False)
+    op.create_index('idx_audit_runs_website_started', 'audit_runs', ['website_id', 'started_at'], unique=False)
+
+    op.add_column('audit_results', sa.Column('run_id', sa.Integer(), nullable=True))
+    op.create_index('idx_audit_results_run_date_id', 'audit_results', ['run_id', 'audit_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_audit_results_run_date_id', table_name='audit_results')
+    op.drop_column('audit_results', 'run_id')
+    op.drop_index('idx_audit_runs_website_started', table_name='audit_runs')
+    op.drop_index(op.f('ix_audit_runs_id'), table_name='audit_runs')
+    op.drop_table('audit_runs')
@@ -0,0 +1,33 @@
+"""Add report store columns to audit_results
+
+Revision ID: 8e4f06b1c9d7
+Revises: 5d21c7e0a4f3
+Create Date: 2026-10-16 11:40:51.226713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f06b1c9d7'
+down_revision: Union[str, Sequence[str], None] = '5d21c7e0a4f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('audit_results', sa.Column('report_key', sa.String(), nullable=True))
+    op.add_column('audit_results', sa.Column('report_size', sa.Integer(), nullable=True))
+    op.add_column('audit_results', sa.Column('report_hash', sa.String(length=64), nullable=True))
+    # Existing full_report payloads are moved out with the migrate_reports_to_store task
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('audit_results', 'report_hash')
+    op.drop_column('audit_results', 'report_size')
+    op.drop_column('audit_results', 'report_key')
@@ -0,0 +1,30 @@
+"""Add id-ordered keyset indexes to audit_results
+
+Revision ID: 9c3e5a7f2b14
+Revises: 5b9e3f2a7c18
+Create Date: 2026-10-16 22:41:05.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5a7f2b14'
+down_revision: Union[str, Sequence[str], None] = '5b9e3f2a7c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_audit_results_website_id_id', 'audit_results', ['website_id', 'id'], unique=False)
+    op.create_index('idx_audit_results_run_id_id', 'audit_results', ['run_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_audit_results_run_id_id', table_name='audit_results')
+    op.drop_index('idx_audit_results_website_id_id', table_name='audit_results')
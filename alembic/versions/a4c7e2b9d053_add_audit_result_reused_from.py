@@ -0,0 +1,28 @@
+"""Add reused_from_id to audit results
+
+Revision ID: a4c7e2b9d053
+Revises: 6e1d8b3f4a27
+Create Date: 2026-10-16 18:03:27.514902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2b9d053'
+down_revision: Union[str, Sequence[str], None] = '6e1d8b3f4a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('audit_results', sa.Column('reused_from_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('audit_results', 'reused_from_id')
@@ -0,0 +1,42 @@
+"""Add crawl_state table
+
+Revision ID: bae91d9c2800
+Revises: 3b4a922bac87
+Create Date: 2026-10-16 09:12:04.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bae91d9c2800'
+down_revision: Union[str, Sequence[str], None] = '3b4a922bac87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('crawl_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('website_id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('etag', sa.String(), nullable=True),
+    sa.Column('last_modified', sa.String(), nullable=True),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('links', sa.JSON(), nullable=True),
+    sa.Column('last_fetched', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_crawl_state_id'), 'crawl_state', ['id'], unique=False)
+    op.create_index('idx_crawl_state_website_url', 'crawl_state', ['website_id', 'url'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_crawl_state_website_url', table_name='crawl_state')
+    op.drop_index(op.f('ix_crawl_state_id'), table_name='crawl_state')
+    op.drop_table('crawl_state')
@@ -0,0 +1,64 @@
+"""Add audit_metrics table
+
+Revision ID: c31a9f5e7b20
+Revises: 8e4f06b1c9d7
+Create Date: 2026-10-16 13:05:12.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c31a9f5e7b20'
+down_revision: Union[str, Sequence[str], None] = '8e4f06b1c9d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_metrics',
+    sa.Column('audit_result_id', sa.Integer(), nullable=False),
+    sa.Column('website_id', sa.Integer(), nullable=False),
+    sa.Column('device_type', sa.String(), nullable=False),
+    sa.Column('audit_date', sa.DateTime(), nullable=False),
+    sa.Column('lcp_ms', sa.Float(), nullable=True),
+    sa.Column('cls', sa.Float(), nullable=True),
+    sa.Column('tbt_ms', sa.Float(), nullable=True),
+    sa.Column('fcp_ms', sa.Float(), nullable=True),
+    sa.Column('speed_index_ms', sa.Float(), nullable=True),
+    sa.Column('tti_ms', sa.Float(), nullable=True),
+    sa.Column('total_byte_weight', sa.BigInteger(), nullable=True),
+    sa.Column('total_requests', sa.Integer(), nullable=True),
+    sa.Column('total_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('document_requests', sa.Integer(), nullable=True),
+    sa.Column('document_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('script_requests', sa.Integer(), nullable=True),
+    sa.Column('script_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('stylesheet_requests', sa.Integer(), nullable=True),
+    sa.Column('stylesheet_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('image_requests', sa.Integer(), nullable=True),
+    sa.Column('image_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('font_requests', sa.Integer(), nullable=True),
+    sa.Column('font_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('media_requests', sa.Integer(), nullable=True),
+    sa.Column('media_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('other_requests', sa.Integer(), nullable=True),
+    sa.Column('other_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('third_party_requests', sa.Integer(), nullable=True),
+    sa.Column('third_party_bytes', sa.BigInteger(), nullable=True),
+    sa.PrimaryKeyConstraint('audit_result_id')
+    )
+    op.create_index('idx_audit_metrics_website_device_date', 'audit_metrics', ['website_id', 'device_type', 'audit_date'], unique=False)
+    op.create_index('idx_audit_metrics_date', 'audit_metrics', ['audit_date'], unique=False)
+    # Existing reports are backfilled with the backfill_audit_metrics task
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_audit_metrics_date', table_name='audit_metrics')
+    op.drop_index('idx_audit_metrics_website_device_date', table_name='audit_metrics')
+    op.drop_table('audit_metrics')
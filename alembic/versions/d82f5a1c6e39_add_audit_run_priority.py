@@ -0,0 +1,28 @@
+"""Add priority to audit runs
+
+Revision ID: d82f5a1c6e39
+Revises: a4c7e2b9d053
+Create Date: 2026-10-16 18:41:55.302716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd82f5a1c6e39'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e2b9d053'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('audit_runs', sa.Column('priority', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('audit_runs', 'priority')
@@ -0,0 +1,28 @@
+"""Add dispatched_at to audit runs
+
+Revision ID: e5b2d9a4c716
+Revises: 9c3e5a7f2b14
+Create Date: 2026-10-17 09:12:38.604152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2d9a4c716'
+down_revision: Union[str, Sequence[str], None] = '9c3e5a7f2b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('audit_runs', sa.Column('dispatched_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('audit_runs', 'dispatched_at')
@@ -0,0 +1,45 @@
+"""Add keyset pagination indexes to audit_results
+
+Revision ID: f7b3e2d91a64
+Revises: c31a9f5e7b20
+Create Date: 2026-10-16 14:22:37.501946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3e2d91a64'
+down_revision: Union[str, Sequence[str], None] = 'c31a9f5e7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_audit_results_website_date_id', 'audit_results', ['website_id', 'audit_date', 'id'], unique=False)
+    op.create_index('idx_audit_results_website_status_date_id', 'audit_results', ['website_id', 'status', 'audit_date', 'id'], unique=False)
+    op.create_index(
+        'idx_audit_results_website_url_prefix',
+        'audit_results',
+        ['website_id', 'page_url'],
+        unique=False,
+        postgresql_ops={'page_url': 'text_pattern_ops'}
+    )
+    op.create_index(
+        'idx_audit_results_website_perf_id',
+        'audit_results',
+        ['website_id', sa.text('coalesce(performance_score, -1.0)'), 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_audit_results_website_perf_id', table_name='audit_results')
+    op.drop_index('idx_audit_results_website_url_prefix', table_name='audit_results')
+    op.drop_index('idx_audit_results_website_status_date_id', table_name='audit_results')
+    op.drop_index('idx_audit_results_website_date_id', table_name='audit_results')
@@ -1,14 +1,80 @@
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.config.setting import settings
+from app.utils.metrics import instrument_engine
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def _async_database_url(url: str) -> str:
+    """Point a postgresql:// URL at the asyncpg driver"""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        # asyncpg takes ssl= instead of libpq's sslmode=
+        if "sslmode" in parsed.query:
+            query = dict(parsed.query)
+            query["ssl"] = query.pop("sslmode")
+            parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+# Sync engine, for scripts and anything outside the request path
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the FastAPI endpoints so queries don't block the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_database_url(SQLALCHEMY_DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+def _batch_executemany_options(url: str) -> dict:
+    """Send executemany UPDATEs in pages instead of one round trip per row (psycopg2 only)"""
+    if make_url(url).get_dialect().driver == "psycopg2":
+        return {"executemany_mode": "values_plus_batch"}
+    return {}
+
+
+# Celery workers get their own small pool: each process runs few tasks at a time,
+# and many worker processes must not exhaust the database's connection limit.
+# Result writes are bulk executemany statements, so they are batched on the wire.
+worker_engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.WORKER_DB_POOL_SIZE,
+    max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    **_batch_executemany_options(SQLALCHEMY_DATABASE_URL)
+)
+
+WorkerSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=worker_engine)
+
+# Query timings per route/task for the /metrics endpoint and worker exporters
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+instrument_engine(worker_engine)
+
 Base = declarative_base()
 
 
@@ -17,4 +83,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,24 @@
 from celery import Celery
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
 import os
+import time
+
+# Module the audit tasks are defined in; Celery names tasks after it
+AUDIT_TASKS = "app.routers.v1.audit.audit"
 
 # Celery configuration
 celery_app = Celery(
     "lighthouse_auditor",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379"),
-    include=["tasks"]
+    include=[AUDIT_TASKS]
 )
 
 celery_app.conf.update(
@@ -15,8 +27,92 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # Honour message priorities on the Redis broker (0 is highest)
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        "sep": ":",
+    },
+    task_default_priority=3,
+    # Take one task at a time so priorities and fair sharing apply to what runs next
+    worker_prefetch_multiplier=1,
     task_routes={
-        "tasks.audit_website": {"queue": "audit"},
-        "tasks.audit_single_page": {"queue": "page_audit"}
+        f"{AUDIT_TASKS}.audit_website": {"queue": "audit"},
+        # Interactive single-page audits get their own low-latency queue and workers
+        f"{AUDIT_TASKS}.audit_single_page": {"queue": "page_audit_interactive"},
+        f"{AUDIT_TASKS}.audit_page_batch": {"queue": "page_audit"},
+        f"{AUDIT_TASKS}.finalize_audit_run": {"queue": "audit"},
+        f"{AUDIT_TASKS}.reap_batch_leases": {"queue": "audit"},
+        f"{AUDIT_TASKS}.migrate_reports_to_store": {"queue": "audit"},
+        f"{AUDIT_TASKS}.backfill_audit_metrics": {"queue": "audit"}
+    },
+    # Frees fair-share window slots held by batches whose worker died
+    beat_schedule={
+        "reap-batch-leases": {
+            "task": f"{AUDIT_TASKS}.reap_batch_leases",
+            "schedule": float(os.getenv("FAIR_SHARE_REAP_SECONDS", "60")),
+        }
     }
-)
\ No newline at end of file
+)
+
+@worker_process_init.connect
+def reset_worker_db_pool(**kwargs):
+    """Drop connections inherited from the parent process after fork"""
+    from app.config.base import worker_engine
+    worker_engine.dispose(close=False)
+
+
+@worker_process_init.connect
+def clean_dead_process_metrics(**kwargs):
+    """Forget live gauge values of pool processes that were killed or recycled"""
+    from app.utils.metrics import mark_dead_processes
+    mark_dead_processes()
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs):
+    """Start the worker's event loop and HTTP session before the first task"""
+    from app.utils.worker_runtime import get_worker_runtime
+    get_worker_runtime()
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs):
+    from app.utils.worker_runtime import close_worker_runtime
+    close_worker_runtime()
+
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(**kwargs):
+    """Stop counting this process in livesum gauges such as the Lighthouse queue depth"""
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead()
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Serve the worker's metrics, aggregated over its pool processes in multiprocess mode"""
+    from app.config.setting import settings
+    from app.utils.metrics import reset_multiprocess_dir, start_exporter
+    if settings.METRICS_WORKER_PORT > 0:
+        reset_multiprocess_dir()
+        start_exporter(settings.METRICS_WORKER_PORT)
+
+
+@before_task_publish.connect
+def stamp_publish_time(headers=None, **kwargs):
+    """Record when a task was sent, for queue wait time on the worker"""
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect
+def start_task_metrics(task_id=None, task=None, **kwargs):
+    from app.utils.metrics import task_started
+    task_started(task_id, task)
+
+
+@task_postrun.connect
+def record_task_metrics(task_id=None, task=None, retval=None, state=None, **kwargs):
+    from app.utils.metrics import task_finished
+    task_finished(task_id, task, retval, state)
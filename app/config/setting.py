@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +10,83 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str
     GROQ_API_KEY: str
 
+    # Database connection pools; the API and each Celery worker process have their own
+    ASYNC_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL with the asyncpg driver
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    WORKER_DB_POOL_SIZE: int = 2
+    WORKER_DB_MAX_OVERFLOW: int = 2
+
+    # Auth: threads for bcrypt, and how long a token's user is trusted without a query
+    PASSWORD_HASH_WORKERS: int = 4
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60
+    AUTH_USER_CACHE_SIZE: int = 1024
+
+    # Crawler
+    CRAWLER_VISITED_BACKEND: str = "set"  # "set" or "fingerprint" for very large crawls
+
+    # Cluster-wide request rate per target origin, shared by crawls and Lighthouse runs.
+    # Off by default; any rate set here also caps how fast a single crawl can go.
+    ORIGIN_RATE_LIMIT_PER_SECOND: float = 0  # e.g. 2.0 for fragile sites; 0 disables rate limiting
+    ORIGIN_RATE_LIMIT_BURST: float = 5.0
+    ORIGIN_RATE_LIMIT_MIN_PER_SECOND: float = 0.1  # floor for adaptive backoff
+    ORIGIN_RATE_LIMIT_RECOVERY_SECONDS: float = 60.0
+    LIGHTHOUSE_RATE_LIMIT_COST: float = 5.0  # tokens per Lighthouse run, which loads many resources
+
+    # Shared HTTP session kept by each worker process
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 10
+    HTTP_DNS_CACHE_SECONDS: int = 300
+    HTTP_KEEPALIVE_SECONDS: float = 30
+    HTTP_REQUEST_TIMEOUT_SECONDS: float = 10
+
+    # Lighthouse
+    LIGHTHOUSE_USE_CHROME_POOL: bool = False
+    CHROME_PATH: str = "google-chrome"
+    CHROME_POOL_SIZE: int = 2
+    CHROME_MAX_AUDITS_PER_INSTANCE: int = 50
+    LIGHTHOUSE_MAX_CONCURRENCY: int = 0  # 0 = derive from cpu_count / cores per audit
+    LIGHTHOUSE_CORES_PER_AUDIT: float = 1.0
+    LIGHTHOUSE_MAX_LOAD_RATIO: float = 0.8
+    # Lock files that cap concurrent runs across all worker processes on a host ("" = per process).
+    # The per-host cap is LIGHTHOUSE_MAX_CONCURRENCY for batch and interactive runs combined;
+    # LIGHTHOUSE_INTERACTIVE_SLOTS of it are only used by single-page audits
+    LIGHTHOUSE_SLOT_DIR: str = "/tmp/perflens-lighthouse-slots"
+    LIGHTHOUSE_INTERACTIVE_SLOTS: int = 1
+    LIGHTHOUSE_TIMEOUT_SECONDS: int = 120
+
+    # Batch tasks a normal-priority run may have queued or running at once
+    FAIR_SHARE_WINDOW: int = 4
+    # A released batch's slot is reclaimed if it hasn't started or finished in time
+    FAIR_SHARE_LEASE_SECONDS: int = 3600
+    FAIR_SHARE_REAP_SECONDS: int = 60
+
+    # Reuse of unchanged pages' results; bump the version after upgrading Lighthouse
+    AUDIT_CACHE_TTL_SECONDS: int = 86400  # 0 disables the cache
+    AUDIT_CACHE_CONFIG_VERSION: str = "1"
+
+    # Prometheus exporter port in each Celery worker's main process (0 disables)
+    METRICS_WORKER_PORT: int = 9808
+
+    # Report storage
+    REPORT_STORE_BACKEND: str = "local"  # "local" or "s3"
+    REPORT_STORE_PATH: str = "/app/reports"
+    REPORT_STORE_COMPRESSION: str = "zstd"  # "zstd" or "gzip"
+    REPORT_STORE_S3_BUCKET: str = ""
+    REPORT_STORE_S3_PREFIX: str = "reports/"
+    REPORT_STORE_S3_ENDPOINT_URL: Optional[str] = None
+
+    # Celery task time limits (seconds); soft limits cancel and clean up running audits
+    CRAWL_SOFT_TIME_LIMIT: int = 3600
+    CRAWL_TIME_LIMIT: int = 3660
+    PAGE_AUDIT_SOFT_TIME_LIMIT: int = 180
+    PAGE_AUDIT_TIME_LIMIT: int = 240
+    PAGE_BATCH_SOFT_TIME_LIMIT: int = 1800
+    PAGE_BATCH_TIME_LIMIT: int = 1860
+
     class Config:
         env_file = ".env"
 
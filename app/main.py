@@ -1,10 +1,14 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from app.config.base import async_engine
+from app.middlewares.metrics import MetricsMiddleware
 from app.routers.v1.router import router as api_router
+from app.utils.metrics import render_latest
 # from app.routers.v2.router import router as api_router_v2
 import uvicorn
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router, prefix="/api/v1")
 # app.include_router(api_router_v2, prefix="/api/v2")
@@ -15,5 +19,16 @@ def read_root():
     return {"message": "Hello World"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    await async_engine.dispose()
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import time
+
+from app.utils.metrics import HTTP_REQUEST_SECONDS, reset_route, route_label, set_route
+
+
+class MetricsMiddleware:
+    """Times API requests by route and labels their database queries with it.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so the route set here is seen
+    by the endpoint's own context. The route template is only known after
+    routing, so the scope itself is handed over and resolved when needed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = set_route(scope)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                route=route_label(scope),
+                method=scope["method"],
+                status=str(status["code"])
+            ).observe(time.perf_counter() - start)
+            reset_route(token)
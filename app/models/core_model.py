@@ -2,6 +2,7 @@ from datetime import datetime
 from uuid import uuid4
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Column,
     DateTime,
     Float,
@@ -10,6 +11,7 @@ from sqlalchemy import (
     Boolean,
     Index,
     Text,
+    func,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
@@ -28,11 +30,39 @@ class Website(Base, BaseModel):
     last_crawled = Column(DateTime)
     total_pages = Column(Integer, default=0)
 
+class AuditRun(Base):
+    __tablename__ = "audit_runs"
+    
+    # One crawl-and-audit of a website; its page audits point back here
+    id = Column(Integer, primary_key=True, index=True)
+    website_id = Column(Integer, nullable=False)
+    status = Column(String, default="running")  # running, completed
+    priority = Column(String, default="normal")  # high, normal, low
+    started_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    # Set once every page audit has been queued, so completion can be derived without Redis
+    dispatched_at = Column(DateTime, nullable=True)
+    total_pages = Column(Integer, default=0)
+    include_mobile = Column(Boolean, default=True)
+    include_desktop = Column(Boolean, default=True)
+    
+    # Template sampling: pages audited per template (NULL = every page) and coverage
+    sample_per_template = Column(Integer, nullable=True)
+    templates = Column(JSON, nullable=True)
+    
+    # Per-device counts and average scores, computed once by the finalizer
+    summary = Column(JSON, nullable=True)
+    
+    __table_args__ = (
+        Index("idx_audit_runs_website_started", "website_id", "started_at"),
+    )
+
 class AuditResult(Base):
     __tablename__ = "audit_results"
     
     id = Column(Integer, primary_key=True, index=True)
     website_id = Column(Integer, index=True)
+    run_id = Column(Integer, nullable=True)  # NULL for audits that predate audit runs
     page_url = Column(String, index=True)
     device_type = Column(String)  # 'mobile' or 'desktop'
     audit_date = Column(DateTime, default=datetime.utcnow)
@@ -44,10 +74,112 @@ class AuditResult(Base):
     seo_score = Column(Float, nullable=True)
     pwa_score = Column(Float, nullable=True)
     
-    # Full Lighthouse report JSON
-    full_report = Column(JSON, nullable=True)
+    # Full Lighthouse report JSON (legacy rows only; new reports live in the report store)
+    full_report = Column(JSON(none_as_null=True), nullable=True)
+    
+    # Compressed report in the content-addressed report store
+    report_key = Column(String, nullable=True)
+    report_size = Column(Integer, nullable=True)  # uncompressed bytes
+    report_hash = Column(String(64), nullable=True)  # sha256 of the JSON bytes
     
     # Status
     status = Column(String, default="pending")  # pending, completed, failed
     error_message = Column(Text, nullable=True)
-    
\ No newline at end of file
+    
+    # Template cluster the page was sampled from, for sampled runs
+    template_key = Column(String, nullable=True)
+    
+    # Earlier audit whose result was reused because the page had not changed
+    reused_from_id = Column(Integer, nullable=True)
+    
+    # Composite indexes backing keyset pagination and filters on the results endpoint
+    __table_args__ = (
+        Index("idx_audit_results_website_date_id", "website_id", "audit_date", "id"),
+        Index("idx_audit_results_website_status_date_id", "website_id", "status", "audit_date", "id"),
+        Index("idx_audit_results_run_date_id", "run_id", "audit_date", "id"),
+        Index("idx_audit_results_website_id_id", "website_id", "id"),
+        Index("idx_audit_results_run_id_id", "run_id", "id"),
+        Index(
+            "idx_audit_results_website_url_prefix",
+            "website_id",
+            "page_url",
+            postgresql_ops={"page_url": "text_pattern_ops"}
+        ),
+    )
+    
+
+# Expression index for sorting by performance score with NULLs last-in-order
+Index(
+    "idx_audit_results_website_perf_id",
+    AuditResult.website_id,
+    func.coalesce(AuditResult.performance_score, -1.0),
+    AuditResult.id,
+)
+
+
+class CrawlState(Base):
+    __tablename__ = "crawl_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    website_id = Column(Integer, nullable=False)
+    url = Column(String, nullable=False)
+
+    # HTTP validators used for conditional recrawls
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    canonical_url = Column(String, nullable=True)
+    # DOM skeleton fingerprint used to group pages by template
+    structure_hash = Column(String(16), nullable=True)
+
+    # Same-domain links found on the page, reused when it comes back 304
+    links = Column(JSON, nullable=True)
+    last_fetched = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_crawl_state_website_url", "website_id", "url", unique=True),
+    )
+
+
+class AuditMetrics(Base):
+    __tablename__ = "audit_metrics"
+
+    # One row per completed audit, filled at ingest time
+    audit_result_id = Column(Integer, primary_key=True)
+    website_id = Column(Integer, nullable=False)
+    device_type = Column(String, nullable=False)
+    audit_date = Column(DateTime, nullable=False)
+
+    # Core Web Vitals and lab metrics
+    lcp_ms = Column(Float, nullable=True)
+    cls = Column(Float, nullable=True)
+    tbt_ms = Column(Float, nullable=True)
+    fcp_ms = Column(Float, nullable=True)
+    speed_index_ms = Column(Float, nullable=True)
+    tti_ms = Column(Float, nullable=True)
+    total_byte_weight = Column(BigInteger, nullable=True)
+
+    # resource-summary request counts and transfer sizes
+    total_requests = Column(Integer, nullable=True)
+    total_bytes = Column(BigInteger, nullable=True)
+    document_requests = Column(Integer, nullable=True)
+    document_bytes = Column(BigInteger, nullable=True)
+    script_requests = Column(Integer, nullable=True)
+    script_bytes = Column(BigInteger, nullable=True)
+    stylesheet_requests = Column(Integer, nullable=True)
+    stylesheet_bytes = Column(BigInteger, nullable=True)
+    image_requests = Column(Integer, nullable=True)
+    image_bytes = Column(BigInteger, nullable=True)
+    font_requests = Column(Integer, nullable=True)
+    font_bytes = Column(BigInteger, nullable=True)
+    media_requests = Column(Integer, nullable=True)
+    media_bytes = Column(BigInteger, nullable=True)
+    other_requests = Column(Integer, nullable=True)
+    other_bytes = Column(BigInteger, nullable=True)
+    third_party_requests = Column(Integer, nullable=True)
+    third_party_bytes = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index("idx_audit_metrics_website_device_date", "website_id", "device_type", "audit_date"),
+        Index("idx_audit_metrics_date", "audit_date"),
+    )
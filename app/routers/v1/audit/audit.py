@@ -1,15 +1,44 @@
 from app.config.celery_app import celery_app
-from app.config.base import get_db
+from celery import group
+from app.config.base import get_async_db, WorkerSessionLocal
+from app.config.setting import settings
 from app.utils.crawler import WebsiteCrawler
 from app.utils.lighthouse_runner import LighthouseRunner
-from app.models.core_model import SessionLocal, Website, AuditResult
+from app.utils.report_store import ReportNotFoundError, get_report_store, encoding_for_key
+from app.utils.report_fields import extract_fields, parse_fields
+from app.utils.progress import get_progress
+from app.utils.result_writer import ResultWriter
+from app.utils.result_cache import get_result_cache
+from app.utils.worker_runtime import get_worker_runtime
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.template_sampler import TemplateSampler
+from app.utils.metrics import REPORT_SIZE_BYTES
+from app.utils.fair_queue import (
+    CELERY_PRIORITIES,
+    LANE_INTERACTIVE,
+    PRIORITY_NORMAL,
+    get_fair_dispatcher,
+    get_queue_wait_stats,
+    run_window,
+)
+from app.models.core_model import Website, AuditRun, AuditResult, AuditMetrics, CrawlState
 from datetime import datetime
+import asyncio
+import base64
+import hashlib
+import json
 import logging
-from fastapi import APIRouter, FastAPI, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+import time
+import redis
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, BackgroundTasks, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models.core_model import AuditRequest, AuditStatus, AuditResultResponse, LighthouseScores
-from typing import List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.schemas.audit import AuditRequest, PageAuditRequest, AuditStatus, AuditResultResponse, LighthouseScores
+from typing import Any, Dict, List, Optional, Set
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,11 +46,479 @@ logging.basicConfig(level=logging.INFO)
 
 router = APIRouter()
 
+# Pages are handed to the page audit queue in small batches while crawling
+PAGE_DISPATCH_BATCH_SIZE = 10
+PAGE_DISPATCH_MAX_WAIT_SECONDS = 2.0
+# Batch tasks are published together as one Celery group over a single producer
+DISPATCH_GROUP_SIZE = 20
 
-@celery_app.task
-def audit_website(website_url: str, website_name: str, include_mobile: bool, include_desktop: bool, max_pages: int):
+# Rows per upsert statement when persisting crawl state
+CRAWL_STATE_CHUNK_SIZE = 500
+
+
+def _run_devices(include_mobile: bool, include_desktop: bool) -> List[str]:
+    """Device types audited by a run, in dispatch order"""
+    devices = []
+    if include_desktop:
+        devices.append("desktop")
+    if include_mobile:
+        devices.append("mobile")
+    return devices
+
+
+def _create_pending_audits(db: Session, run_id: Optional[int], website_id: int, page_urls: List[str], devices: List[str], templates: Optional[Dict[str, str]] = None) -> Dict[tuple, int]:
+    """Insert pending audit rows for every page and device in one statement.
+
+    Returns the new audit result ids keyed by (page_url, device_type).
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "run_id": run_id,
+            "website_id": website_id,
+            "page_url": page_url,
+            "device_type": device_type,
+            "audit_date": now,
+            "status": "pending",
+            "template_key": templates.get(page_url) if templates else None,
+        }
+        for page_url in page_urls
+        for device_type in devices
+    ]
+    created = db.execute(
+        insert(AuditResult).returning(AuditResult.id, AuditResult.page_url, AuditResult.device_type),
+        rows
+    ).all()
+    db.commit()
+    return {(row.page_url, row.device_type): row.id for row in created}
+
+
+def _content_fingerprint(page_state: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Identify a page's content from its crawl state: body hash, else ETag"""
+    if not page_state:
+        return None
+    if page_state.get('content_hash'):
+        return page_state['content_hash']
+    if page_state.get('etag'):
+        return f"etag:{page_state['etag']}"
+    return None
+
+
+def _publish_batches(payloads: List[Dict[str, Any]]):
+    """Publish batch tasks as one group, each at its run's broker priority"""
+    if payloads:
+        group(
+            audit_page_batch.si(**payload).set(priority=CELERY_PRIORITIES[payload["priority"]])
+            for payload in payloads
+        ).apply_async()
+
+
+def _release_next_batches(run_id: int, priority: str, lease_id: Optional[str]):
+    """Hand a finished batch's slot in the run's window to its next queued batch"""
+    try:
+        ready = get_fair_dispatcher().release(
+            run_id, lease_id=lease_id, window=run_window(settings.FAIR_SHARE_WINDOW, priority)
+        )
+        _publish_batches(ready)
+    except Exception as e:
+        logger.error(f"Could not release queued batches for run {run_id}: {e}")
+
+
+def _publish_page_audits(db: Session, run_id: int, website_id: int, batches: List[List[str]], devices: List[str], page_states: Dict[str, Dict[str, Any]], force_refresh: bool = False, priority: str = PRIORITY_NORMAL, templates: Optional[Dict[str, str]] = None):
+    """Create the group's pending rows and queue its batch tasks behind the run's window.
+
+    Pending is counted before publishing so completion can't be seen early.
+    """
+    page_urls = [page_url for batch in batches for page_url in batch]
+    audit_ids = _create_pending_audits(db, run_id, website_id, page_urls, devices, templates)
+    queued_at = time.time()
+    payloads = [
+        {
+            "website_id": website_id,
+            "run_id": run_id,
+            "device_type": device_type,
+            "audits": [
+                [audit_ids[(page_url, device_type)], page_url, _content_fingerprint(page_states.get(page_url))]
+                for page_url in batch
+            ],
+            "force_refresh": force_refresh,
+            "priority": priority,
+            "queued_at": queued_at,
+        }
+        for batch in batches
+        for device_type in devices
+    ]
+    get_progress().add_pending(run_id, len(audit_ids))
+    
+    try:
+        ready = get_fair_dispatcher().submit(
+            run_id, payloads, run_window(settings.FAIR_SHARE_WINDOW, priority)
+        )
+    except redis.RedisError as e:
+        # Fair sharing is best effort; never hold audits back because Redis is down
+        logger.warning(f"Could not queue batches fairly for run {run_id}, publishing directly: {e}")
+        ready = payloads
+    _publish_batches(ready)
+
+
+async def _crawl_and_dispatch(crawler: WebsiteCrawler, db: Session, run_id: int, website_id: int, devices: List[str], force_refresh: bool = False, priority: str = PRIORITY_NORMAL, sampler: Optional[TemplateSampler] = None) -> int:
+    """Stream pages out of the crawler and dispatch their audits in grouped batches.
+
+    With a sampler, only the pages it picks as template representatives are audited.
+    """
+    if crawler.session is None:
+        # Reuse the worker's pooled connections and DNS cache across crawls
+        crawler.session = await get_worker_runtime().http_session()
+    batch: List[str] = []
+    batches: List[List[str]] = []
+    last_publish = time.monotonic()
+    pages_found = 0
+
+    def close_batch():
+        nonlocal batch
+        if batch:
+            batches.append(batch)
+            batch = []
+
+    async def publish():
+        nonlocal batches, last_publish
+        close_batch()
+        if batches and devices:
+            page_urls = [page_url for batch in batches for page_url in batch]
+            templates = None
+            if sampler is not None:
+                templates = sampler.templates_for(page_urls)
+            # Snapshot the group's page state, since the crawl keeps updating it meanwhile
+            page_states = {page_url: crawler.page_states.get(page_url) for page_url in page_urls}
+            # The DB, Redis and broker calls block, so run them off the loop to keep fetches going.
+            # Awaiting here keeps one publish in flight, so pending is counted in dispatch order
+            await asyncio.to_thread(
+                _publish_page_audits,
+                db, run_id, website_id, batches, devices, page_states, force_refresh, priority, templates
+            )
+        batches = []
+        last_publish = time.monotonic()
+
+    async for page_url in crawler.iter_pages():
+        pages_found += 1
+        if sampler is not None and not sampler.offer(page_url, crawler.page_states.get(page_url)):
+            continue
+        batch.append(page_url)
+
+        if len(batch) >= PAGE_DISPATCH_BATCH_SIZE:
+            close_batch()
+        # Publish full groups, or whatever is ready if the crawl is slow
+        if (
+            len(batches) * len(devices) >= DISPATCH_GROUP_SIZE
+            or time.monotonic() - last_publish >= PAGE_DISPATCH_MAX_WAIT_SECONDS
+        ):
+            await publish()
+
+    await publish()
+    return pages_found
+
+
+def _load_crawl_state(db: Session, website_id: int) -> Dict[str, Dict[str, Any]]:
+    """Load the per-page state recorded by the previous crawl of a website"""
+    rows = db.query(
+        CrawlState.url,
+        CrawlState.etag,
+        CrawlState.last_modified,
+        CrawlState.content_hash,
+        CrawlState.structure_hash,
+        CrawlState.canonical_url,
+        CrawlState.links
+    ).filter(CrawlState.website_id == website_id)
+
+    return {
+        row.url: {
+            'etag': row.etag,
+            'last_modified': row.last_modified,
+            'content_hash': row.content_hash,
+            'structure_hash': row.structure_hash,
+            'canonical_url': row.canonical_url,
+            'links': row.links or [],
+        }
+        for row in rows
+    }
+
+
+def _save_crawl_state(db: Session, website_id: int, page_states: Dict[str, Dict[str, Any]]):
+    """Upsert the per-page crawl state so the next crawl can be conditional"""
+    now = datetime.utcnow()
+    rows = [
+        {
+            'website_id': website_id,
+            'url': url,
+            'etag': state.get('etag'),
+            'last_modified': state.get('last_modified'),
+            'content_hash': state.get('content_hash'),
+            'structure_hash': state.get('structure_hash'),
+            'canonical_url': state.get('canonical_url'),
+            'links': state.get('links') or [],
+            'last_fetched': now,
+        }
+        for url, state in page_states.items()
+    ]
+
+    for start in range(0, len(rows), CRAWL_STATE_CHUNK_SIZE):
+        stmt = pg_insert(CrawlState).values(rows[start:start + CRAWL_STATE_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CrawlState.website_id, CrawlState.url],
+            set_={
+                'etag': stmt.excluded.etag,
+                'last_modified': stmt.excluded.last_modified,
+                'content_hash': stmt.excluded.content_hash,
+                'structure_hash': stmt.excluded.structure_hash,
+                'canonical_url': stmt.excluded.canonical_url,
+                'links': stmt.excluded.links,
+                'last_fetched': stmt.excluded.last_fetched,
+            }
+        )
+        db.execute(stmt)
+    db.commit()
+
+
+def _maybe_finalize(run_id: int):
+    """Queue the finalizer if this was the last audit of the run"""
+    if get_progress().claim_finalization(run_id):
+        finalize_audit_run.delay(run_id)
+
+
+def _queue_finalize(run_id: int):
+    """Queue the finalizer for a run found finished in SQL; it is idempotent"""
+    try:
+        finalize_audit_run.delay(run_id)
+    except Exception as e:
+        logger.warning(f"Could not queue finalization of audit run {run_id}: {e}")
+
+
+def _mark_dispatched(db: Session, run: AuditRun):
+    """Record that no more audits will be queued for a run that stopped early"""
+    try:
+        db.rollback()
+        run.dispatched_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Could not mark audit run {run.id} as dispatched: {e}")
+
+
+def _run_async(coro, runner: Optional[LighthouseRunner] = None):
+    """Run a coroutine to completion on this worker process's event loop.
+
+    If the task is interrupted (e.g. SoftTimeLimitExceeded), the coroutine is
+    cancelled and given a chance to clean up; any Lighthouse processes still
+    left are then killed synchronously.
+    """
+    try:
+        return get_worker_runtime().run(coro)
+    except BaseException:
+        if runner is not None:
+            runner.kill_all()
+        raise
+
+
+def _store_report(page_url: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    """Put a report in the report store and return the columns that reference it"""
+    try:
+        stored = get_report_store().put(report)
+    except Exception as e:
+        # Never lose a finished audit because the store is unavailable
+        logger.error(f"Could not store report for {page_url}, keeping it inline: {e}")
+        return {"report_key": None, "report_size": None, "report_hash": None, "full_report": report}
+
+    return {
+        "report_key": stored["key"],
+        "report_size": stored["size"],
+        "report_hash": stored["hash"],
+        "full_report": None,
+    }
+
+
+def _metrics_fields(runner: LighthouseRunner, website_id: int, device_type: str, audit_date: datetime, report: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values of the normalized metrics row for a completed audit"""
+    return {
+        "website_id": website_id,
+        "device_type": device_type,
+        "audit_date": audit_date,
+        **runner.extract_metrics(report)
+    }
+
+
+def _record_audit(writer: ResultWriter, runner: LighthouseRunner, audit_id: int, website_id: int, page_url: str, device_type: str, report: Optional[Dict[str, Any]]) -> bool:
+    """Queue a finished audit (or its failure) on the writer; True if it completed"""
+    audit_date = datetime.utcnow()
+    if not report:
+        writer.add(audit_id, {
+            "status": "failed",
+            "error_message": "Lighthouse audit failed",
+            "audit_date": audit_date,
+        })
+        return False
+
+    scores = runner.extract_scores(report)
+    stored = _store_report(page_url, report)
+    if stored["report_size"] is not None:
+        REPORT_SIZE_BYTES.labels(device_type=device_type, outcome="stored").observe(stored["report_size"])
+    writer.add(
+        audit_id,
+        {
+            "performance_score": scores.get('performance'),
+            "accessibility_score": scores.get('accessibility'),
+            "best_practices_score": scores.get('best_practices'),
+            "seo_score": scores.get('seo'),
+            "pwa_score": scores.get('pwa'),
+            "status": "completed",
+            "error_message": None,
+            "audit_date": audit_date,
+            **stored
+        },
+        _metrics_fields(runner, website_id, device_type, audit_date, report)
+    )
+    return True
+
+
+def _fail_pending_audits(db: Session, audit_ids: List[int], message: str) -> int:
+    """Mark audits that never got a result as failed; returns how many were"""
+    db.rollback()
+    failed = db.query(AuditResult).filter(
+        AuditResult.id.in_(audit_ids),
+        AuditResult.status == "pending"
+    ).update({"status": "failed", "error_message": message}, synchronize_session=False)
+    db.commit()
+    return failed
+
+
+def _reuse_cached_audits(db: Session, writer: ResultWriter, website_id: int, audits: List[List[Any]], cache_keys: List[Optional[str]]) -> Set[int]:
+    """Copy cached results onto audits of unchanged pages; returns the reused audit ids"""
+    lookups = {audit[0]: key for audit, key in zip(audits, cache_keys) if key}
+    if not lookups:
+        return set()
+    
+    cache = get_result_cache()
+    cached = {
+        audit_id: source_id
+        for audit_id, source_id in zip(lookups, cache.get_many(list(lookups.values())))
+        if source_id
+    }
+    if not cached:
+        return set()
+    
+    # Only results whose report is still in the store can be reused
+    sources = {
+        row.id: row
+        for row in db.query(
+            AuditResult.id,
+            AuditResult.performance_score,
+            AuditResult.accessibility_score,
+            AuditResult.best_practices_score,
+            AuditResult.seo_score,
+            AuditResult.pwa_score,
+            AuditResult.report_key,
+            AuditResult.report_size,
+            AuditResult.report_hash
+        ).filter(
+            AuditResult.id.in_(set(cached.values())),
+            AuditResult.status == "completed",
+            AuditResult.report_key.isnot(None)
+        )
+    }
+    metrics = {
+        row.audit_result_id: row
+        for row in db.query(AuditMetrics).filter(AuditMetrics.audit_result_id.in_(list(sources)))
+    }
+    
+    now = datetime.utcnow()
+    reused: Set[int] = set()
+    stale = []
+    for audit_id, source_id in cached.items():
+        source = sources.get(source_id)
+        if source is None:
+            stale.append(lookups[audit_id])
+            continue
+        
+        source_metrics = metrics.get(source_id)
+        writer.add(
+            audit_id,
+            {
+                "performance_score": source.performance_score,
+                "accessibility_score": source.accessibility_score,
+                "best_practices_score": source.best_practices_score,
+                "seo_score": source.seo_score,
+                "pwa_score": source.pwa_score,
+                "report_key": source.report_key,
+                "report_size": source.report_size,
+                "report_hash": source.report_hash,
+                "status": "completed",
+                "error_message": None,
+                "audit_date": now,
+                "reused_from_id": source_id,
+            },
+            {
+                **{
+                    column.name: getattr(source_metrics, column.name)
+                    for column in AuditMetrics.__table__.columns
+                    if column.name != "audit_result_id"
+                },
+                "website_id": website_id,
+                "audit_date": now,
+            } if source_metrics is not None else None
+        )
+        reused.add(audit_id)
+    
+    cache.evict(stale)
+    return reused
+
+
+def _audit_pages(db: Session, runner: LighthouseRunner, website_id: int, device_type: str, audits: List[List[Any]], force_refresh: bool = False) -> int:
+    """Audit pending [audit_id, page_url, content_fingerprint] entries; returns how many completed.
+
+    Pages whose content and Lighthouse settings match a recent audit reuse
+    that result instead of running Lighthouse again, unless force_refresh.
+    """
+    config_fingerprint = runner.config_fingerprint(device_type)
+    cache_keys = [
+        get_result_cache().key(page_url, device_type, config_fingerprint, content_fingerprint)
+        if content_fingerprint else None
+        for _, page_url, content_fingerprint in audits
+    ]
+    
+    writer = ResultWriter(db, flush_size=len(audits))
+    reused = set() if force_refresh else _reuse_cached_audits(db, writer, website_id, audits, cache_keys)
+    to_run = [
+        (audit, key)
+        for audit, key in zip(audits, cache_keys)
+        if audit[0] not in reused
+    ]
+    
+    # Run Lighthouse audits; the runner's scheduler decides how many run at once
+    reports = []
+    if to_run:
+        reports = _run_async(
+            runner.run_audits([(audit[1], device_type) for audit, _ in to_run]),
+            runner
+        )
+    
+    completed = len(reused)
+    fresh = {}
+    for ((audit_id, page_url, _), key), report in zip(to_run, reports):
+        if _record_audit(writer, runner, audit_id, website_id, page_url, device_type, report):
+            completed += 1
+            if key:
+                fresh[key] = audit_id
+    writer.flush()
+    
+    get_result_cache().put_many(fresh)
+    if reused:
+        logger.info(f"Reused {len(reused)} cached {device_type} audits for website {website_id}")
+    return completed
+
+
+@celery_app.task(soft_time_limit=settings.CRAWL_SOFT_TIME_LIMIT, time_limit=settings.CRAWL_TIME_LIMIT)
+def audit_website(website_url: str, website_name: str, include_mobile: bool, include_desktop: bool, max_pages: int, discovery_mode: str = "links", query_params: Optional[List[str]] = None, force_refresh: bool = False, priority: str = PRIORITY_NORMAL, sample_per_template: Optional[int] = None):
     """Main task to audit entire website"""
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     
     try:
         # Create or get website record
@@ -36,91 +533,314 @@ def audit_website(website_url: str, website_name: str, include_mobile: bool, inc
             db.commit()
             db.refresh(website)
         
-        # Crawl website to get all pages
-        crawler = WebsiteCrawler(website_url, max_pages)
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        pages = loop.run_until_complete(crawler.crawl())
-        loop.close()
+        # Every audit of this crawl belongs to a new run
+        run = AuditRun(
+            website_id=website.id,
+            status="running",
+            priority=priority,
+            started_at=datetime.utcnow(),
+            include_mobile=include_mobile,
+            include_desktop=include_desktop,
+            sample_per_template=sample_per_template
+        )
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        get_progress().reset(run.id)
+        
+        # Crawl website and queue page audits while the crawl is still running
+        sampler = TemplateSampler(sample_per_template) if sample_per_template else None
+        crawler = WebsiteCrawler(
+            website_url,
+            max_pages,
+            discovery_mode=discovery_mode,
+            allowed_query_params=query_params,
+            visited_backend=settings.CRAWLER_VISITED_BACKEND,
+            previous_state=_load_crawl_state(db, website.id),
+            rate_limiter=get_rate_limiter()
+        )
+        pages_found = _run_async(
+            _crawl_and_dispatch(
+                crawler,
+                db,
+                run.id,
+                website.id,
+                _run_devices(include_mobile, include_desktop),
+                force_refresh,
+                priority,
+                sampler
+            )
+        )
+        
+        _save_crawl_state(db, website.id, crawler.page_states)
+        logger.info(
+            f"Crawled {website_url}: {pages_found} pages, "
+            f"{crawler.not_modified_count} unchanged since last crawl"
+        )
         
-        # Update website with page count
-        website.total_pages = len(pages)
+        # Update website and run with page count
+        website.total_pages = pages_found
         website.last_crawled = datetime.utcnow()
+        run.total_pages = pages_found
+        run.dispatched_at = datetime.utcnow()
+        if sampler is not None:
+            run.templates = sampler.summary()
+            logger.info(
+                f"Sampled {sampler.sampled_pages} of {pages_found} pages "
+                f"across {len(sampler.templates)} templates for {website_url}"
+            )
         db.commit()
         
-        # Queue individual page audits
-        for page_url in pages:
-            if include_desktop:
-                audit_single_page.delay(website.id, page_url, "desktop")
-            if include_mobile:
-                audit_single_page.delay(website.id, page_url, "mobile")
+        # Every audit is queued now; finalize here if they have all finished already
+        get_progress().mark_dispatch_complete(run.id)
+        _maybe_finalize(run.id)
                 
-        return {"status": "success", "pages_found": len(pages), "website_id": website.id}
+        return {"status": "success", "pages_found": pages_found, "website_id": website.id, "run_id": run.id}
         
     except Exception as e:
         logger.error(f"Error auditing website {website_url}: {e}")
+        if 'run' in locals() and run.id:
+            # Let the audits that were queued before the failure still finalize
+            _mark_dispatched(db, run)
+            get_progress().mark_dispatch_complete(run.id)
+            _maybe_finalize(run.id)
         return {"status": "error", "message": str(e)}
     finally:
         db.close()
 
-@celery_app.task
-def audit_single_page(website_id: int, page_url: str, device_type: str):
-    """Task to audit a single page"""
-    db = SessionLocal()
+@celery_app.task(soft_time_limit=settings.PAGE_AUDIT_SOFT_TIME_LIMIT, time_limit=settings.PAGE_AUDIT_TIME_LIMIT)
+def audit_single_page(website_id: int, page_url: str, device_type: str, content_fingerprint: Optional[str] = None, force_refresh: bool = False, queued_at: Optional[float] = None):
+    """Task to audit a single page outside of any audit run (the interactive lane)"""
+    get_queue_wait_stats().record(LANE_INTERACTIVE, queued_at)
+    db = WorkerSessionLocal()
     
     try:
-        # Create audit result record
-        audit_result = AuditResult(
-            website_id=website_id,
-            page_url=page_url,
-            device_type=device_type,
-            audit_date=datetime.utcnow(),
-            status="pending"
+        audit_id = _create_pending_audits(db, None, website_id, [page_url], [device_type])[(page_url, device_type)]
+        
+        runner = LighthouseRunner(interactive=True)
+        completed = _audit_pages(
+            db, runner, website_id, device_type, [[audit_id, page_url, content_fingerprint]], force_refresh
         )
-        db.add(audit_result)
-        db.commit()
-        db.refresh(audit_result)
         
-        # Run Lighthouse audit
+        return {"status": "completed" if completed else "failed", "audit_id": audit_id}
+        
+    except Exception as e:
+        logger.error(f"Error auditing page {page_url}: {e}")
+        if 'audit_id' in locals():
+            _fail_pending_audits(db, [audit_id], str(e))
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(soft_time_limit=settings.PAGE_BATCH_SOFT_TIME_LIMIT, time_limit=settings.PAGE_BATCH_TIME_LIMIT)
+def audit_page_batch(website_id: int, run_id: int, device_type: str, audits: List[List[Any]], force_refresh: bool = False, priority: str = PRIORITY_NORMAL, queued_at: Optional[float] = None, lease_id: Optional[str] = None):
+    """Task to audit a batch of pages concurrently on one event loop.
+
+    audits holds [audit_result_id, page_url, content_fingerprint] entries
+    whose pending rows were created at dispatch time; results are written
+    back in one bulk flush. When done, the run's next queued batch is released.
+    """
+    get_queue_wait_stats().record(priority, queued_at)
+    # Hold the window slot for as long as this task may run
+    get_fair_dispatcher().renew(run_id, lease_id, settings.PAGE_BATCH_TIME_LIMIT + settings.FAIR_SHARE_REAP_SECONDS)
+    db = WorkerSessionLocal()
+    progress = get_progress()
+    progress.start(run_id, len(audits))
+    progress_recorded = False
+    
+    try:
         runner = LighthouseRunner()
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        report = loop.run_until_complete(runner.run_audit(page_url, device_type))
-        loop.close()
+        completed = _audit_pages(db, runner, website_id, device_type, audits, force_refresh)
         
-        if report:
-            # Extract scores
-            scores = runner.extract_scores(report)
-            
-            # Update audit result
-            audit_result.performance_score = scores.get('performance')
-            audit_result.accessibility_score = scores.get('accessibility')
-            audit_result.best_practices_score = scores.get('best_practices')
-            audit_result.seo_score = scores.get('seo')
-            audit_result.pwa_score = scores.get('pwa')
-            audit_result.full_report = report
-            audit_result.status = "completed"
-        else:
-            audit_result.status = "failed"
-            audit_result.error_message = "Lighthouse audit failed"
+        progress.finish(run_id, completed=completed, failed=len(audits) - completed)
+        progress_recorded = True
+        _maybe_finalize(run_id)
+        
+        return {
+            "status": "success",
+            "audit_ids": [audit[0] for audit in audits],
+            "completed": completed
+        }
         
+    except Exception as e:
+        logger.error(f"Error auditing page batch for run {run_id}: {e}")
+        failed = len(audits)
+        try:
+            failed = _fail_pending_audits(db, [audit[0] for audit in audits], str(e))
+        except Exception as db_error:
+            logger.error(f"Could not mark batch audits failed for run {run_id}: {db_error}")
+        if not progress_recorded:
+            progress.finish(run_id, completed=len(audits) - failed, failed=failed)
+            _maybe_finalize(run_id)
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+        _release_next_batches(run_id, priority, lease_id)
+
+@celery_app.task
+def reap_batch_leases():
+    """Reclaim window slots of batches lost with their worker and publish the batches behind them"""
+    try:
+        ready = get_fair_dispatcher().reap()
+    except redis.RedisError as e:
+        logger.warning(f"Could not reap batch leases: {e}")
+        return {"status": "error", "message": str(e)}
+    _publish_batches(ready)
+    return {"status": "success", "released": len(ready)}
+
+
+@celery_app.task
+def finalize_audit_run(run_id: int):
+    """Mark an audit run complete and compute its summary once"""
+    db = WorkerSessionLocal()
+    
+    try:
+        run = db.query(AuditRun).filter(AuditRun.id == run_id).first()
+        if not run:
+            return {"status": "error", "message": "Audit run not found"}
+        
+        rows = db.query(
+            AuditResult.device_type,
+            func.count(AuditResult.id).label("audits"),
+            func.count(AuditResult.id).filter(AuditResult.status == "completed").label("completed"),
+            func.count(AuditResult.id).filter(AuditResult.status == "failed").label("failed"),
+            func.avg(AuditResult.performance_score).label("performance"),
+            func.avg(AuditResult.accessibility_score).label("accessibility"),
+            func.avg(AuditResult.best_practices_score).label("best_practices"),
+            func.avg(AuditResult.seo_score).label("seo")
+        ).filter(AuditResult.run_id == run_id).group_by(AuditResult.device_type).all()
+        
+        def average(value):
+            return round(float(value), 2) if value is not None else None
+        
+        run.summary = {
+            row.device_type: {
+                "audits": row.audits,
+                "completed": row.completed,
+                "failed": row.failed,
+                "average_scores": {
+                    "performance": average(row.performance),
+                    "accessibility": average(row.accessibility),
+                    "best_practices": average(row.best_practices),
+                    "seo": average(row.seo)
+                }
+            }
+            for row in rows
+        }
+        run.status = "completed"
+        run.completed_at = datetime.utcnow()
         db.commit()
         
-        return {"status": audit_result.status, "audit_id": audit_result.id}
+        return {"status": "success", "run_id": run_id}
         
     except Exception as e:
-        logger.error(f"Error auditing page {page_url}: {e}")
-        if 'audit_result' in locals():
-            audit_result.status = "failed"
-            audit_result.error_message = str(e)
-            db.commit()
+        logger.error(f"Error finalizing audit run {run_id}: {e}")
         return {"status": "error", "message": str(e)}
     finally:
         db.close()
 
 
+@celery_app.task
+def migrate_reports_to_store(batch_size: int = 100):
+    """Move inline full_report payloads into the report store, batch by batch"""
+    db = WorkerSessionLocal()
+    writer = ResultWriter(db, flush_size=batch_size)
+    migrated = 0
+    last_id = 0
+    
+    try:
+        while True:
+            results = (
+                db.query(AuditResult.id, AuditResult.page_url, AuditResult.full_report)
+                .filter(
+                    AuditResult.id > last_id,
+                    AuditResult.report_key.is_(None),
+                    AuditResult.full_report.isnot(None)
+                )
+                .order_by(AuditResult.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not results:
+                break
+            
+            for result in results:
+                if result.full_report is None:
+                    continue
+                fields = _store_report(result.page_url, result.full_report)
+                if fields["report_key"]:
+                    writer.add(result.id, fields)
+                    migrated += 1
+            last_id = results[-1].id
+            writer.flush()
+        
+        logger.info(f"Moved {migrated} reports into the report store")
+        return {"status": "success", "migrated": migrated}
+        
+    except Exception as e:
+        logger.error(f"Error migrating reports: {e}")
+        return {"status": "error", "message": str(e), "migrated": writer.written}
+    finally:
+        db.close()
+
+@celery_app.task
+def backfill_audit_metrics(batch_size: int = 200):
+    """Extract metrics rows for completed audits that predate the metrics table"""
+    db = WorkerSessionLocal()
+    runner = LighthouseRunner()
+    store = get_report_store()
+    writer = ResultWriter(db, flush_size=batch_size)
+    last_id = 0
+    
+    try:
+        while True:
+            results = (
+                db.query(
+                    AuditResult.id,
+                    AuditResult.website_id,
+                    AuditResult.device_type,
+                    AuditResult.audit_date,
+                    AuditResult.report_key,
+                    AuditResult.full_report
+                )
+                .outerjoin(AuditMetrics, AuditMetrics.audit_result_id == AuditResult.id)
+                .filter(
+                    AuditResult.id > last_id,
+                    AuditResult.status == "completed",
+                    AuditMetrics.audit_result_id.is_(None)
+                )
+                .order_by(AuditResult.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not results:
+                break
+            
+            for result in results:
+                try:
+                    report = store.get(result.report_key) if result.report_key else result.full_report
+                except Exception as e:
+                    logger.error(f"Could not load report for audit {result.id}: {e}")
+                    continue
+                if report:
+                    writer.add_metrics(
+                        result.id,
+                        _metrics_fields(runner, result.website_id, result.device_type, result.audit_date, report)
+                    )
+            
+            last_id = results[-1].id
+            writer.flush()
+        
+        logger.info(f"Backfilled metrics for {writer.written} audits")
+        return {"status": "success", "backfilled": writer.written}
+        
+    except Exception as e:
+        logger.error(f"Error backfilling audit metrics: {e}")
+        return {"status": "error", "message": str(e), "backfilled": writer.written}
+    finally:
+        db.close()
+
 
 # app = FastAPI(
 #     title="Lighthouse Audit Tool",
@@ -129,7 +849,7 @@ def audit_single_page(website_id: int, page_url: str, device_type: str):
 # )
 
 @router.post("/audit", response_model=dict)
-async def start_audit(audit_request: AuditRequest, db: Session = Depends(get_db)):
+async def start_audit(audit_request: AuditRequest, db: AsyncSession = Depends(get_async_db)):
     """Start a comprehensive audit of a website"""
     try:
         # Start the audit task
@@ -138,7 +858,12 @@ async def start_audit(audit_request: AuditRequest, db: Session = Depends(get_db)
             website_name=audit_request.website_name,
             include_mobile=audit_request.include_mobile,
             include_desktop=audit_request.include_desktop,
-            max_pages=audit_request.max_pages or 100
+            max_pages=audit_request.max_pages or 100,
+            discovery_mode=audit_request.discovery_mode.value,
+            query_params=audit_request.query_params,
+            force_refresh=audit_request.force_refresh,
+            priority=audit_request.priority.value,
+            sample_per_template=audit_request.sample_per_template
         )
         
         return {
@@ -151,51 +876,240 @@ async def start_audit(audit_request: AuditRequest, db: Session = Depends(get_db)
         logger.error(f"Error starting audit: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/audit/page", response_model=dict)
+async def start_page_audit(page_request: PageAuditRequest, db: AsyncSession = Depends(get_async_db)):
+    """Audit one page right away on the interactive lane"""
+    website = await db.get(Website, page_request.website_id)
+    if not website:
+        raise HTTPException(status_code=404, detail="Website not found")
+    
+    task = audit_single_page.delay(
+        website_id=website.id,
+        page_url=str(page_request.page_url),
+        device_type=page_request.device_type.value,
+        force_refresh=page_request.force_refresh,
+        queued_at=time.time()
+    )
+    
+    return {
+        "message": "Page audit started successfully",
+        "task_id": task.id,
+        "page_url": str(page_request.page_url)
+    }
+
+@router.get("/audit/queue-wait", response_model=dict)
+async def get_queue_wait():
+    """Recent time page audits waited for a worker, per priority and lane"""
+    # The stats client is synchronous; keep its Redis round trip off the event loop
+    return await run_in_threadpool(get_queue_wait_stats().summary)
+
+async def _latest_run(db: AsyncSession, website_id: int) -> Optional[AuditRun]:
+    result = await db.execute(
+        select(AuditRun)
+        .where(AuditRun.website_id == website_id)
+        .order_by(AuditRun.started_at.desc(), AuditRun.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
 @router.get("/audit/{website_id}/status", response_model=AuditStatus)
-async def get_audit_status(website_id: int, db: Session = Depends(get_db)):
-    """Get the status of an ongoing audit"""
-    website = db.query(Website).filter(Website.id == website_id).first()
+async def get_audit_status(website_id: int, run_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """Get the status of an audit run (the latest one unless run_id is given)"""
+    website = await db.get(Website, website_id)
     if not website:
         raise HTTPException(status_code=404, detail="Website not found")
     
-    total_audits = db.query(AuditResult).filter(AuditResult.website_id == website_id).count()
-    completed_audits = db.query(AuditResult).filter(
-        AuditResult.website_id == website_id,
-        AuditResult.status == "completed"
-    ).count()
+    if run_id is not None:
+        run = await db.get(AuditRun, run_id)
+        if not run or run.website_id != website_id:
+            raise HTTPException(status_code=404, detail="Audit run not found")
+    else:
+        run = await _latest_run(db, website_id)
+    
+    # Progress counters live in Redis behind a sync client; read them off the event loop
+    progress = get_progress()
+    counts = await run_in_threadpool(progress.get, run.id) if run else None
+    live_counts = counts is not None
+    if counts is None:
+        # No live counters (expired or Redis unavailable): one grouped query
+        query = select(AuditResult.status, func.count(AuditResult.id))
+        if run:
+            query = query.filter(AuditResult.run_id == run.id)
+        else:
+            # Audits from before runs existed
+            query = query.filter(AuditResult.website_id == website_id)
+        rows = (await db.execute(query.group_by(AuditResult.status))).all()
+        by_status = {row_status: count for row_status, count in rows}
+        counts = {
+            "pending": by_status.get("pending", 0),
+            "running": 0,
+            "completed": by_status.get("completed", 0),
+            "failed": by_status.get("failed", 0),
+        }
+    
+    total_audits = sum(counts.values())
+    remaining = counts["pending"] + counts["running"]
+    estimated_completion = None
+    if run and remaining:
+        estimated_completion = await run_in_threadpool(progress.estimate_completion, run.id, counts)
     
     # Determine overall status
-    if total_audits == 0:
+    if run and run.status == "completed":
+        status = "completed"
+    elif run and not live_counts and run.dispatched_at and remaining == 0:
+        # Without Redis counters the finalizer is never triggered, so trigger it from here
+        status = "completed"
+        await run_in_threadpool(_queue_finalize, run.id)
+    elif total_audits == 0:
         status = "pending"
-    elif completed_audits == total_audits:
+    elif remaining == 0 and run is None:
         status = "completed"
     else:
         status = "in_progress"
     
     return AuditStatus(
         id=website.id,
+        run_id=run.id if run else None,
         website_url=website.url,
         status=status,
-        total_pages=website.total_pages or 0,
-        completed_audits=completed_audits,
-        created_at=website.created_at
+        total_pages=(run.total_pages if run else website.total_pages) or 0,
+        completed_audits=counts["completed"],
+        failed_audits=counts["failed"],
+        created_at=run.started_at if run else website.created_at,
+        estimated_completion=estimated_completion
     )
 
+# Keyset pagination sort keys; scores sort with NULLs as -1 to match the expression index.
+# "created" (the default) is the primary key, so it never changes under a cursor;
+# audit_date and scores are rewritten when a pending audit completes.
+RESULT_SORT_KEYS = {
+    "created": AuditResult.id,
+    "audit_date": AuditResult.audit_date,
+    "performance": func.coalesce(AuditResult.performance_score, -1.0),
+}
+
+SCORE_COLUMNS = {
+    "performance": AuditResult.performance_score,
+    "accessibility": AuditResult.accessibility_score,
+    "best_practices": AuditResult.best_practices_score,
+    "seo": AuditResult.seo_score,
+}
+
+MAX_RESULTS_PAGE_SIZE = 200
+
+
+def _encode_cursor(sort: str, value: Any, result_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, result_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, sort: str):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, result_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort:
+            raise ValueError("cursor was issued for a different sort")
+        if sort == "audit_date":
+            value = datetime.fromisoformat(value)
+        elif sort == "created":
+            value = int(value)
+        return value, int(result_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
 @router.get("/audit/{website_id}/results", response_model=List[AuditResultResponse])
 async def get_audit_results(
     website_id: int,
+    response: Response,
+    run_id: Optional[int] = None,
     device_type: Optional[str] = None,
+    status: Optional[str] = None,
+    url_prefix: Optional[str] = None,
+    score_category: str = "performance",
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: str = "created",
+    order: str = "desc",
+    cursor: Optional[str] = None,
     page: int = 1,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get audit results for a website"""
-    query = db.query(AuditResult).filter(AuditResult.website_id == website_id)
+    """Get audit results for a website.
+
+    Results are keyset-paginated on (sort key, id): pass the X-Next-Cursor
+    response header back as cursor= to get the next page. page= still
+    works without a cursor but gets slower the deeper it goes. The default
+    sort=created is stable while a run is still writing results; the other
+    sorts may skip or repeat rows that complete between pages.
+    """
+    if sort not in RESULT_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(RESULT_SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    if score_category not in SCORE_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"score_category must be one of {sorted(SCORE_COLUMNS)}")
+    limit = max(1, min(limit, MAX_RESULTS_PAGE_SIZE))
+    
+    sort_key = RESULT_SORT_KEYS[sort]
     
+    # Only the summary columns; the report payload is never loaded here
+    query = select(
+        AuditResult.id,
+        AuditResult.page_url,
+        AuditResult.device_type,
+        AuditResult.audit_date,
+        AuditResult.performance_score,
+        AuditResult.accessibility_score,
+        AuditResult.best_practices_score,
+        AuditResult.seo_score,
+        AuditResult.pwa_score,
+        AuditResult.status,
+        AuditResult.error_message,
+        AuditResult.reused_from_id,
+        sort_key.label("sort_value")
+    ).filter(AuditResult.website_id == website_id)
+    
+    if run_id is not None:
+        query = query.filter(AuditResult.run_id == run_id)
     if device_type:
         query = query.filter(AuditResult.device_type == device_type)
+    if status:
+        query = query.filter(AuditResult.status == status)
+    if url_prefix:
+        query = query.filter(AuditResult.page_url.like(_escape_like(url_prefix) + '%', escape='\\'))
+    if min_score is not None:
+        query = query.filter(SCORE_COLUMNS[score_category] >= min_score)
+    if max_score is not None:
+        query = query.filter(SCORE_COLUMNS[score_category] <= max_score)
+    
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort)
+        position = tuple_(sort_key, AuditResult.id)
+        query = query.filter(position < (value, last_id) if order == "desc" else position > (value, last_id))
     
-    results = query.offset((page - 1) * limit).limit(limit).all()
+    if order == "desc":
+        query = query.order_by(sort_key.desc(), AuditResult.id.desc())
+    else:
+        query = query.order_by(sort_key.asc(), AuditResult.id.asc())
+    
+    if not cursor and page > 1:
+        query = query.offset((page - 1) * limit)
+    
+    # Fetch one extra row to know whether another page exists
+    results = (await db.execute(query.limit(limit + 1))).all()
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(sort, last.sort_value, last.id)
     
     return [
         AuditResultResponse(
@@ -211,24 +1125,232 @@ async def get_audit_results(
                 pwa=result.pwa_score
             ),
             status=result.status,
-            error_message=result.error_message
+            error_message=result.error_message,
+            reused_from_id=result.reused_from_id
         )
         for result in results
     ]
 
+def _accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows the given coding.
+
+    An explicit entry for the coding takes precedence over "*", whatever
+    their order (RFC 9110 12.5.3).
+    """
+    wildcard = None
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if coding not in (encoding, '*'):
+            continue
+        quality = params.strip()
+        accepted = True
+        if quality.startswith('q='):
+            try:
+                accepted = float(quality[2:]) > 0
+            except ValueError:
+                accepted = False
+        if coding == encoding:
+            return accepted
+        wildcard = accepted
+    return bool(wildcard)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2), so W/ prefixes are ignored
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+
 @router.get("/audit/{audit_id}/full-report")
-async def get_full_report(audit_id: int, db: Session = Depends(get_db)):
-    """Get the complete Lighthouse report for a specific audit"""
-    result = db.query(AuditResult).filter(AuditResult.id == audit_id).first()
+async def get_full_report(
+    audit_id: int,
+    request: Request,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the complete Lighthouse report for a specific audit.
+
+    Pass fields= with comma-separated JSON pointers or dotted paths
+    (e.g. audits.largest-contentful-paint) to fetch only those parts.
+    """
+    result = (await db.execute(
+        select(
+            AuditResult.id,
+            AuditResult.report_key,
+            AuditResult.report_hash
+        ).where(AuditResult.id == audit_id)
+    )).first()
     if not result:
         raise HTTPException(status_code=404, detail="Audit result not found")
     
-    return JSONResponse(content=result.full_report)
+    field_list = parse_fields(fields) if fields else []
+    
+    if not result.report_key:
+        # Legacy row with the report still inline
+        full_report = await db.scalar(select(AuditResult.full_report).where(AuditResult.id == audit_id))
+        if field_list:
+            return JSONResponse(content=extract_fields(full_report or {}, field_list))
+        return JSONResponse(content=full_report)
+    
+    store = get_report_store()
+    stored_encoding = encoding_for_key(result.report_key)
+    passthrough = not field_list and _accepts_encoding(
+        request.headers.get('accept-encoding', ''), stored_encoding
+    )
+    
+    # Strong ETags must differ per representation: field subset and content coding
+    etag_parts = [result.report_hash]
+    if field_list:
+        etag_parts.append(hashlib.sha1(','.join(field_list).encode()).hexdigest()[:16])
+    if passthrough:
+        etag_parts.append(stored_encoding)
+    etag = '"' + '.'.join(etag_parts) + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        if field_list:
+            # Reading, decompressing and parsing a multi-MB report would stall the event loop
+            subset = await run_in_threadpool(
+                lambda: extract_fields(store.get(result.report_key), field_list)
+            )
+            return JSONResponse(content=subset, headers=headers)
+        
+        # Open the object before answering, so a missing report is a 404 rather than a broken 200
+        if passthrough:
+            body = await run_in_threadpool(store.iter_compressed, result.report_key)
+            headers["Content-Encoding"] = stored_encoding
+        else:
+            body = await run_in_threadpool(store.iter_decompressed, result.report_key)
+    except ReportNotFoundError:
+        logger.error(f"Stored report {result.report_key} for audit {audit_id} is missing")
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    return StreamingResponse(body, media_type="application/json", headers=headers)
+
+@router.get("/audit/{website_id}/metrics", response_model=List[dict])
+async def get_metrics_summary(website_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get p75 Core Web Vitals and average page weight per device type"""
+    def p75(column):
+        return func.percentile_cont(0.75).within_group(column)
+    
+    rows = (await db.execute(select(
+        AuditMetrics.device_type,
+        func.count(AuditMetrics.audit_result_id).label("audits"),
+        p75(AuditMetrics.lcp_ms).label("lcp_ms_p75"),
+        p75(AuditMetrics.cls).label("cls_p75"),
+        p75(AuditMetrics.tbt_ms).label("tbt_ms_p75"),
+        p75(AuditMetrics.fcp_ms).label("fcp_ms_p75"),
+        func.avg(AuditMetrics.total_byte_weight).label("total_byte_weight_avg"),
+        func.avg(AuditMetrics.total_requests).label("total_requests_avg")
+    ).where(
+        AuditMetrics.website_id == website_id
+    ).group_by(AuditMetrics.device_type))).all()
+    
+    return [
+        {
+            "device_type": row.device_type,
+            "audits": row.audits,
+            "lcp_ms_p75": row.lcp_ms_p75,
+            "cls_p75": row.cls_p75,
+            "tbt_ms_p75": row.tbt_ms_p75,
+            "fcp_ms_p75": row.fcp_ms_p75,
+            "total_byte_weight_avg": float(row.total_byte_weight_avg) if row.total_byte_weight_avg is not None else None,
+            "total_requests_avg": float(row.total_requests_avg) if row.total_requests_avg is not None else None
+        }
+        for row in rows
+    ]
+
+@router.get("/audit/{website_id}/templates", response_model=List[dict])
+async def get_template_summary(website_id: int, run_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    """Get per-template scores and sampling coverage for a sampled audit run"""
+    if run_id is not None:
+        run = await db.get(AuditRun, run_id)
+        if run and run.website_id != website_id:
+            run = None
+    else:
+        run = await _latest_run(db, website_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Audit run not found")
+    
+    rows = (await db.execute(select(
+        AuditResult.template_key,
+        AuditResult.device_type,
+        func.count(AuditResult.id).filter(AuditResult.status == "completed").label("completed"),
+        func.avg(AuditResult.performance_score).label("performance"),
+        func.avg(AuditResult.accessibility_score).label("accessibility"),
+        func.avg(AuditResult.best_practices_score).label("best_practices"),
+        func.avg(AuditResult.seo_score).label("seo")
+    ).where(
+        AuditResult.run_id == run.id,
+        AuditResult.template_key.isnot(None)
+    ).group_by(AuditResult.template_key, AuditResult.device_type))).all()
+    
+    def average(value):
+        return round(float(value), 2) if value is not None else None
+    
+    scores: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        scores.setdefault(row.template_key, {})[row.device_type] = {
+            "completed": row.completed,
+            "average_scores": {
+                "performance": average(row.performance),
+                "accessibility": average(row.accessibility),
+                "best_practices": average(row.best_practices),
+                "seo": average(row.seo)
+            }
+        }
+    
+    templates = run.templates or {}
+    return sorted(
+        (
+            {
+                "template": key,
+                "pattern": template.get("pattern"),
+                "pages": template.get("pages", 0),
+                "sampled": template.get("sampled", 0),
+                "coverage": template.get("coverage"),
+                "examples": template.get("examples", []),
+                "devices": scores.get(key, {})
+            }
+            for key, template in templates.items()
+        ),
+        key=lambda template: template["pages"],
+        reverse=True
+    )
 
 @router.get("/websites", response_model=List[dict])
-async def list_websites(db: Session = Depends(get_db)):
-    """List all audited websites"""
-    websites = db.query(Website).all()
+async def list_websites(db: AsyncSession = Depends(get_async_db)):
+    """List all audited websites with their latest audit run"""
+    websites = (await db.execute(select(Website))).scalars().all()
+    runs = await db.execute(
+        select(AuditRun)
+        .distinct(AuditRun.website_id)
+        .order_by(AuditRun.website_id, AuditRun.started_at.desc(), AuditRun.id.desc())
+    )
+    latest_runs = {run.website_id: run for run in runs.scalars()}
+    
+    def run_summary(run: Optional[AuditRun]):
+        if run is None:
+            return None
+        return {
+            "id": run.id,
+            "status": run.status,
+            "started_at": run.started_at,
+            "completed_at": run.completed_at,
+            "total_pages": run.total_pages,
+            "summary": run.summary
+        }
+    
     return [
         {
             "id": website.id,
@@ -236,7 +1358,8 @@ async def list_websites(db: Session = Depends(get_db)):
             "name": website.name,
             "created_at": website.created_at,
             "last_crawled": website.last_crawled,
-            "total_pages": website.total_pages
+            "total_pages": website.total_pages,
+            "latest_run": run_summary(latest_runs.get(website.id))
         }
         for website in websites
     ]
@@ -248,9 +1371,13 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /audit": "Start website audit",
+            "POST /audit/page": "Audit a single page on the interactive lane",
+            "GET /audit/queue-wait": "Get queue wait times per priority",
             "GET /audit/{website_id}/status": "Get audit status",
             "GET /audit/{website_id}/results": "Get audit results",
             "GET /audit/{audit_id}/full-report": "Get full Lighthouse report",
+            "GET /audit/{website_id}/metrics": "Get Core Web Vitals summary",
+            "GET /audit/{website_id}/templates": "Get per-template scores for a sampled run",
             "GET /websites": "List all websites"
         }
     }
\ No newline at end of file
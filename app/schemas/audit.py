@@ -7,19 +7,45 @@ class DeviceType(str, Enum):
     MOBILE = "mobile"
     DESKTOP = "desktop"
 
+class DiscoveryMode(str, Enum):
+    LINKS = "links"
+    SITEMAP = "sitemap"
+    SITEMAP_LINKS = "sitemap+links"
+
+class AuditPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
 class AuditRequest(BaseModel):
     website_url: HttpUrl
     website_name: Optional[str] = None
     include_mobile: bool = True
     include_desktop: bool = True
     max_pages: Optional[int]
+    discovery_mode: DiscoveryMode = DiscoveryMode.LINKS
+    # Query parameters that distinguish pages (e.g. "page", "id"); others are ignored
+    query_params: Optional[List[str]] = None
+    # Run Lighthouse on every page even if a recent result for unchanged content exists
+    force_refresh: bool = False
+    priority: AuditPriority = AuditPriority.NORMAL
+    # Audit only this many pages per page template (URL pattern + DOM structure); None audits all
+    sample_per_template: Optional[int] = None
+
+class PageAuditRequest(BaseModel):
+    website_id: int
+    page_url: HttpUrl
+    device_type: DeviceType = DeviceType.DESKTOP
+    force_refresh: bool = False
 
 class AuditStatus(BaseModel):
     id: int
+    run_id: Optional[int] = None
     website_url: str
     status: str
     total_pages: int
     completed_audits: int
+    failed_audits: int = 0
     created_at: datetime
     estimated_completion: Optional[datetime] = None
 
@@ -37,4 +63,5 @@ class AuditResultResponse(BaseModel):
     audit_date: datetime
     scores: LighthouseScores
     status: str
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    reused_from_id: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,160 @@
+import asyncio
+import fcntl
+import itertools
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+import logging
+
+from app.config.setting import settings
+from app.utils.metrics import LIGHTHOUSE_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+class HostSlots:
+    """Counting semaphore shared by every process on the host, built from lock files.
+
+    Each of `count` files in `directory` is one slot, held with a
+    non-blocking flock. The kernel drops the lock when its process exits,
+    so a killed worker never leaks a slot. Processes in other containers
+    share the slots if they mount the same directory.
+
+    The first `reserved` slots are kept for interactive runs, which may
+    also take any shared slot; other runs only get the shared ones.
+    """
+
+    def __init__(self, directory: str, count: int, reserved: int = 0):
+        self.directory = directory
+        self.count = max(1, count)
+        # At least one slot stays shared so batch runs can always make progress
+        self.reserved = min(max(0, reserved), self.count - 1)
+        os.makedirs(directory, exist_ok=True)
+
+    def try_acquire(self, interactive: bool = False) -> Optional[int]:
+        """Take a free slot and return its file descriptor, or None if all are held"""
+        first = 0 if interactive else self.reserved
+        for index in range(first, self.count):
+            path = os.path.join(self.directory, f"slot-{index}.lock")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def release(self, fd: int):
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class AuditScheduler:
+    """Admission control for concurrent Lighthouse runs.
+
+    A run is admitted while fewer than max_concurrency runs are active and
+    the machine has headroom: the 1-minute load average (or our own running
+    audits, whichever is higher, since the load average lags) plus the cost
+    of one more audit must stay under cpu_count * max_load_ratio. Keeping
+    cores free matters because simulated throttling scores are skewed by
+    CPU contention. Waiting runs are admitted in FIFO order.
+
+    With slot_dir, a run must also hold one of the host-wide slots, so
+    max_concurrency caps every worker process on the host together rather
+    than each process separately. reserved_slots of those are kept for
+    interactive (single-page) runs, which also skip ahead of waiting batch
+    runs in this process, so a large crawl can't hold up the low-latency lane.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        cores_per_audit: float = 1.0,
+        max_load_ratio: float = 0.8,
+        poll_interval: float = 0.5,
+        slot_dir: Optional[str] = None,
+        reserved_slots: int = 0,
+    ):
+        self.cores = os.cpu_count() or 1
+        self.cores_per_audit = max(0.1, cores_per_audit)
+        self.max_concurrency = max_concurrency or max(1, int(self.cores // self.cores_per_audit))
+        self.max_load_ratio = max_load_ratio
+        self.poll_interval = poll_interval
+        self.host_slots = HostSlots(slot_dir, self.max_concurrency, reserved_slots) if slot_dir else None
+        self.running = 0
+        self._waiting: Deque[int] = deque()
+        self._tickets = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of runs waiting for admission"""
+        return len(self._waiting)
+
+    def _load_average(self) -> float:
+        try:
+            return os.getloadavg()[0]
+        except (AttributeError, OSError):
+            return 0.0
+
+    def _has_capacity(self) -> bool:
+        if self.running >= self.max_concurrency:
+            return False
+        if self.running == 0:
+            # Always let one audit through so a busy host still makes progress
+            return True
+        load = max(self._load_average(), self.running * self.cores_per_audit)
+        return load + self.cores_per_audit <= self.cores * self.max_load_ratio
+
+    def _try_admit(self, interactive: bool) -> Optional[int]:
+        """Return a held host slot (-1 without host slots) if a run may start now, else None"""
+        if not self._has_capacity():
+            return None
+        if self.host_slots is None:
+            return -1
+        return self.host_slots.try_acquire(interactive)
+
+    @asynccontextmanager
+    async def slot(self, interactive: bool = False) -> AsyncIterator[None]:
+        """Wait for admission, then hold a run slot for the duration of the block"""
+        ticket = next(self._tickets)
+        self._waiting.append(ticket)
+        LIGHTHOUSE_QUEUE_DEPTH.inc()
+        try:
+            host_slot = None
+            while True:
+                if interactive or self._waiting[0] == ticket:
+                    host_slot = self._try_admit(interactive)
+                    if host_slot is not None:
+                        break
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self._waiting.remove(ticket)
+            LIGHTHOUSE_QUEUE_DEPTH.dec()
+
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            if host_slot >= 0:
+                self.host_slots.release(host_slot)
+
+
+_scheduler: Optional[AuditScheduler] = None
+
+
+def get_audit_scheduler() -> AuditScheduler:
+    """The process-wide scheduler, shared by every LighthouseRunner in this process"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AuditScheduler(
+            max_concurrency=settings.LIGHTHOUSE_MAX_CONCURRENCY or None,
+            cores_per_audit=settings.LIGHTHOUSE_CORES_PER_AUDIT,
+            max_load_ratio=settings.LIGHTHOUSE_MAX_LOAD_RATIO,
+            slot_dir=settings.LIGHTHOUSE_SLOT_DIR or None,
+            reserved_slots=settings.LIGHTHOUSE_INTERACTIVE_SLOTS
+        )
+    return _scheduler
@@ -0,0 +1,249 @@
+import aiohttp
+import asyncio
+import atexit
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHROME_FLAGS = [
+    '--headless=new',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-extensions',
+    '--disable-background-networking',
+]
+STARTUP_TIMEOUT_SECONDS = 20
+HEALTH_CHECK_TIMEOUT_SECONDS = 2
+# Grace period after SIGTERM before the process group is killed
+STOP_TIMEOUT_SECONDS = 5
+STOP_POLL_SECONDS = 0.05
+
+
+class ChromeInstance:
+    """A long-lived headless Chrome exposing a remote-debugging port"""
+
+    def __init__(self, chrome_path: str):
+        self.chrome_path = chrome_path
+        self.process: Optional[subprocess.Popen] = None
+        self.user_data_dir: Optional[str] = None
+        self.port: Optional[int] = None
+        self.audits = 0
+
+    async def start(self):
+        """Launch Chrome and wait until its DevTools endpoint answers"""
+        self.user_data_dir = tempfile.mkdtemp(prefix='chrome-pool-')
+        # Port 0 lets Chrome pick a free port, so worker processes never collide
+        self.process = subprocess.Popen(
+            [
+                self.chrome_path,
+                '--remote-debugging-port=0',
+                f'--user-data-dir={self.user_data_dir}',
+                *CHROME_FLAGS,
+                'about:blank',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            if not self.is_alive():
+                break
+            self.port = self._read_port()
+            if self.port and await self.healthy():
+                logger.info(f"Started pooled Chrome pid={self.process.pid} port={self.port}")
+                return
+            await asyncio.sleep(0.2)
+
+        await self.stop()
+        raise RuntimeError("Chrome did not become ready in time")
+
+    def _read_port(self) -> Optional[int]:
+        # Chrome writes the chosen port to DevToolsActivePort once listening
+        path = os.path.join(self.user_data_dir, 'DevToolsActivePort')
+        try:
+            with open(path, 'r') as f:
+                return int(f.readline().strip())
+        except (OSError, ValueError):
+            return None
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def healthy(self) -> bool:
+        """Check that the process is up and the DevTools endpoint responds"""
+        if not self.is_alive() or not self.port:
+            return False
+        try:
+            timeout = aiohttp.ClientTimeout(total=HEALTH_CHECK_TIMEOUT_SECONDS)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(f'http://127.0.0.1:{self.port}/json/version') as response:
+                    return response.status == 200
+        except Exception:
+            return False
+
+    def _signal_group(self, sig: int):
+        # Chrome runs in its own session, so its renderers and helpers share its pid as group id
+        try:
+            os.killpg(self.process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def stop(self):
+        """Terminate Chrome's process group and remove its profile, without blocking the loop"""
+        if self.process is not None:
+            if self.process.poll() is None:
+                self._signal_group(signal.SIGTERM)
+                deadline = time.monotonic() + STOP_TIMEOUT_SECONDS
+                while self.process.poll() is None and time.monotonic() < deadline:
+                    await asyncio.sleep(STOP_POLL_SECONDS)
+            # Also sweeps children that outlived the main process
+            self._signal_group(signal.SIGKILL)
+            while self.process.poll() is None:
+                await asyncio.sleep(STOP_POLL_SECONDS)
+        if self.user_data_dir:
+            await asyncio.to_thread(shutil.rmtree, self.user_data_dir, True)
+        self._reset()
+
+    def kill(self):
+        """Synchronously kill Chrome's process group, for shutdown when no event loop is running"""
+        if self.process is not None:
+            self._signal_group(signal.SIGKILL)
+            self.process.wait()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+        self._reset()
+
+    def _reset(self):
+        self.process = None
+        self.user_data_dir = None
+        self.port = None
+
+
+class ChromePool:
+    """Per-process pool of headless Chrome instances shared by Lighthouse runs"""
+
+    def __init__(self, size: int, max_audits_per_instance: int, chrome_path: str = 'google-chrome'):
+        self.size = max(1, size)
+        self.max_audits_per_instance = max(1, max_audits_per_instance)
+        self.chrome_path = chrome_path
+        self._idle: Deque[ChromeInstance] = deque()
+        self._instances: List[ChromeInstance] = []
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pid = os.getpid()
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Tasks share the worker runtime's loop, but nested eager runs use a private one, so rebind per loop
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    async def acquire(self) -> ChromeInstance:
+        """Take an idle, healthy instance, starting one if the pool has room"""
+        condition = self._get_condition()
+        async with condition:
+            while not self._idle and len(self._instances) >= self.size:
+                await condition.wait()
+
+            if self._idle:
+                instance = self._idle.popleft()
+            else:
+                instance = ChromeInstance(self.chrome_path)
+                self._instances.append(instance)
+
+        try:
+            if not await instance.healthy():
+                if instance.process is not None:
+                    logger.warning(f"Pooled Chrome on port {instance.port} is unhealthy, restarting")
+                await self._restart(instance)
+        except Exception:
+            self._instances.remove(instance)
+            async with condition:
+                condition.notify()
+            raise
+
+        return instance
+
+    async def release(self, instance: ChromeInstance, recycle: bool = False):
+        """Return an instance, recycling it after max audits, a crash or a failed run"""
+        instance.audits += 1
+        try:
+            if recycle:
+                logger.info(f"Recycling pooled Chrome on port {instance.port} after a failed run")
+                await instance.stop()
+                instance.audits = 0
+            elif not instance.is_alive():
+                logger.warning(f"Pooled Chrome on port {instance.port} crashed, recycling")
+                await instance.stop()
+                instance.audits = 0
+            elif instance.audits >= self.max_audits_per_instance:
+                logger.info(f"Recycling pooled Chrome after {instance.audits} audits")
+                await instance.stop()
+                instance.audits = 0
+        finally:
+            # Returned even if stopping was interrupted; the next acquire() health-checks it.
+            # Stopped instances are relaunched lazily by the next acquire()
+            condition = self._get_condition()
+            async with condition:
+                self._idle.append(instance)
+                condition.notify()
+
+    async def _restart(self, instance: ChromeInstance):
+        await instance.stop()
+        instance.audits = 0
+        await instance.start()
+
+    @asynccontextmanager
+    async def instance(self) -> AsyncIterator[ChromeInstance]:
+        chrome = await self.acquire()
+        failed = False
+        try:
+            yield chrome
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self.release(chrome, recycle=failed)
+
+    def close(self):
+        for instance in self._instances:
+            instance.kill()
+        self._instances.clear()
+        self._idle.clear()
+
+
+_pool: Optional[ChromePool] = None
+
+
+def get_chrome_pool(size: int, max_audits_per_instance: int, chrome_path: str) -> ChromePool:
+    """Return this process's Chrome pool, creating it on first use (and after fork)"""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        _pool = ChromePool(size, max_audits_per_instance, chrome_path)
+    return _pool
+
+
+def close_chrome_pool():
+    global _pool
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
+    _pool = None
+
+
+atexit.register(close_chrome_pool)
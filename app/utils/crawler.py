@@ -1,60 +1,380 @@
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from typing import Set, List
+import hashlib
+import time
+from urllib.parse import urldefrag, urlparse
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+from app.utils.sitemap import SitemapDiscovery
+from app.utils.link_extractor import LinkExtractor, make_decoder
+from app.utils.url_normalizer import normalize_url
+from app.utils.visited_set import VISITED_BACKEND_SET, make_visited_set
+from app.utils.rate_limiter import OriginRateLimiter, parse_retry_after
+from app.utils.metrics import CRAWL_PAGES_DISCOVERED, CRAWLER_FETCH_BYTES, CRAWLER_FETCH_SECONDS
 import logging
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "PerfLens-Crawler"
+CHUNK_SIZE = 64 * 1024
+# Stop reading HTML bodies past this size; links after the cap are ignored
+MAX_BODY_BYTES = 5 * 1024 * 1024
+# Times a page answered with 429/503 is refetched after backing off
+RATE_LIMITED_RETRIES = 2
+
+# Page discovery modes
+DISCOVERY_LINKS = "links"            # follow <a href> from the start page only
+DISCOVERY_SITEMAP = "sitemap"        # use sitemap URLs, fall back to links if none
+DISCOVERY_SITEMAP_LINKS = "sitemap+links"  # seed the link crawl with sitemap URLs
+
 class WebsiteCrawler:
-    def __init__(self, base_url: str, max_pages: int = 100):
+    def __init__(
+        self,
+        base_url: str,
+        max_pages: int = 100,
+        concurrency: int = 10,
+        per_host_limit: int = 10,
+        max_depth: Optional[int] = None,
+        request_timeout: float = 10,
+        discovery_mode: str = DISCOVERY_LINKS,
+        respect_robots: bool = False,
+        previous_state: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_body_bytes: int = MAX_BODY_BYTES,
+        allowed_query_params: Optional[Iterable[str]] = None,
+        visited_backend: str = VISITED_BACKEND_SET,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[OriginRateLimiter] = None,
+    ):
         self.base_url = base_url
         self.max_pages = max_pages
-        self.domain = urlparse(base_url).netloc
-        self.visited_urls: Set[str] = set()
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_depth = max_depth
+        self.request_timeout = request_timeout
+        # Optional long-lived session to reuse connections across crawls
+        self.session = session
+        # Cluster-wide per-origin throttle shared with other workers, if any
+        self.rate_limiter = rate_limiter
+        self.max_body_bytes = max_body_bytes
+        self.discovery_mode = discovery_mode
+        # Sitemap discovery always loads robots.txt, so its rules are honoured too
+        self.respect_robots = respect_robots or discovery_mode != DISCOVERY_LINKS
+        self.sitemap: Optional[SitemapDiscovery] = None
+        # Query parameters that identify distinct pages; all others are dropped
+        self.allowed_query_params = frozenset(allowed_query_params or ())
+        self.domain = urlparse(normalize_url(base_url)).netloc
+        # Canonical form of every URL ever scheduled; use the fingerprint backend for very large crawls.
+        # Pages are fetched, reported and keyed by the URL as linked; the canonical form only dedupes.
+        self.visited_urls = make_visited_set(visited_backend)
+        # Canonical forms of the pages found so far
         self.found_urls: Set[str] = set()
-        
+        # Depth at which each found page was scheduled, keyed by its URL; used for ordering results
+        self.url_depths: Dict[str, int] = {}
+        self._discovered: Optional[asyncio.Queue] = None
+        # Per-page validators and links from the last crawl, keyed by URL
+        self.previous_state = previous_state or {}
+        self.page_states: Dict[str, Dict[str, Any]] = {}
+        self.not_modified_count = 0
+
     async def crawl(self) -> List[str]:
-        """Crawl website and return list of all pages"""
-        async with aiohttp.ClientSession() as session:
-            await self._crawl_page(session, self.base_url)
-        
-        return list(self.found_urls)[:self.max_pages]
-    
-    async def _crawl_page(self, session: aiohttp.ClientSession, url: str):
-        """Recursively crawl a single page"""
-        if url in self.visited_urls or len(self.found_urls) >= self.max_pages:
+        """Crawl website breadth-first and return list of all pages"""
+        async for _ in self.iter_pages():
+            pass
+
+        return self._ordered_results()
+
+    async def iter_pages(self) -> AsyncIterator[str]:
+        """Crawl website and yield each page as soon as it is found.
+
+        Pages are yielded in discovery order, which depends on network timing;
+        use crawl() when a deterministic ordering is needed.
+        """
+        discovered: asyncio.Queue = asyncio.Queue()
+        crawl_task = asyncio.create_task(self._run_frontier(discovered))
+        yielded = 0
+
+        try:
+            while yielded < self.max_pages:
+                url = await discovered.get()
+                if url is None:
+                    break
+                yielded += 1
+                yield url
+
+            # Surface any error raised while setting up the crawl
+            await crawl_task
+        finally:
+            if not crawl_task.done():
+                crawl_task.cancel()
+                await asyncio.gather(crawl_task, return_exceptions=True)
+
+    async def _run_frontier(self, discovered: asyncio.Queue):
+        """Drain the BFS frontier with a pool of workers, publishing found pages"""
+        self._discovered = discovered
+        outcome = "error"
+
+        try:
+            if self.session is not None:
+                # Shared session: connection limits and timeouts are the owner's
+                await self._drain_frontier(self.session)
+            else:
+                connector = aiohttp.TCPConnector(
+                    limit=self.concurrency,
+                    limit_per_host=self.per_host_limit
+                )
+                timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+                async with aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=timeout,
+                    headers={"User-Agent": USER_AGENT}
+                ) as session:
+                    await self._drain_frontier(session)
+            outcome = "limit_reached" if self._limit_reached() else "completed"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            CRAWL_PAGES_DISCOVERED.labels(outcome=outcome).observe(len(self.found_urls))
+            # Sentinel telling iter_pages the crawl is over
+            discovered.put_nowait(None)
+
+    async def _drain_frontier(self, session: aiohttp.ClientSession):
+        seeds = await self._discover_seeds(session)
+        if self.discovery_mode == DISCOVERY_SITEMAP and seeds:
+            # Sitemap replaces the link crawl: no page downloads needed
+            for url in seeds:
+                self.visited_urls.add(self._page_key(url))
+                self._mark_found(url, 1)
             return
-            
-        self.visited_urls.add(url)
-        
+
+        frontier: asyncio.Queue = asyncio.Queue()
+        self._schedule(frontier, self._clean_url(self.base_url) or self.base_url, 0)
+        for url in seeds:
+            self._schedule(frontier, url, 1)
+
+        workers = [
+            asyncio.create_task(self._worker(session, frontier))
+            for _ in range(self.concurrency)
+        ]
         try:
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    self.found_urls.add(url)
-                    
-                    # Only crawl HTML pages
-                    content_type = response.headers.get('content-type', '')
-                    if 'text/html' in content_type:
-                        html = await response.text()
-                        await self._extract_links(session, html, url)
-                        
+            await frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _discover_seeds(self, session: aiohttp.ClientSession) -> List[str]:
+        """Load robots.txt and, in sitemap modes, collect sitemap page URLs"""
+        if not self.respect_robots and self.rate_limiter is None:
+            return []
+
+        sitemap = SitemapDiscovery(self.base_url, user_agent=USER_AGENT)
+        await sitemap.load_robots(session)
+        # Crawl-delay is honoured whenever we throttle, even if robots rules are not
+        crawl_delay = sitemap.crawl_delay()
+        if crawl_delay and self.rate_limiter is not None:
+            await self.rate_limiter.set_crawl_delay(self.base_url, crawl_delay)
+
+        if not self.respect_robots:
+            return []
+        self.sitemap = sitemap
+
+        if self.discovery_mode == DISCOVERY_LINKS:
+            return []
+
+        seeds: List[str] = []
+        seen: Set[str] = set()
+        async for url in self.sitemap.iter_urls(session):
+            clean_url = self._clean_url(url)
+            if clean_url is None or self._page_key(clean_url) in seen:
+                continue
+            seen.add(self._page_key(clean_url))
+            seeds.append(clean_url)
+            if len(seeds) >= self.max_pages:
+                break
+
+        logger.info(f"Sitemap discovery found {len(seeds)} pages for {self.base_url}")
+        return seeds
+
+    def _schedule(self, frontier: asyncio.Queue, url: str, depth: int):
+        """Add a URL to the frontier unless an alias of it was already seen or it is too deep"""
+        key = self._page_key(url)
+        if key in self.visited_urls:
+            return
+        if self.sitemap is not None and not self.sitemap.can_fetch(url):
+            return
+        if self.max_depth is not None and depth > self.max_depth:
+            return
+
+        self.visited_urls.add(key)
+        frontier.put_nowait((url, depth))
+
+    def _mark_found(self, url: str, depth: int):
+        """Record a successfully fetched page and publish it to iter_pages"""
+        key = self._page_key(url)
+        if key in self.found_urls:
+            return
+        self.found_urls.add(key)
+        self.url_depths[url] = depth
+        if self._discovered is not None:
+            self._discovered.put_nowait(url)
+
+    def _limit_reached(self) -> bool:
+        return len(self.found_urls) >= self.max_pages
+
+    async def _worker(self, session: aiohttp.ClientSession, frontier: asyncio.Queue):
+        """Drain the frontier, fetching one page at a time"""
+        while True:
+            url, depth = await frontier.get()
+            try:
+                # Keep draining so frontier.join() returns once the limit is hit
+                if self._limit_reached():
+                    continue
+
+                links = await self._crawl_page(session, url, depth)
+                for link in links:
+                    if self._limit_reached():
+                        break
+                    self._schedule(frontier, link, depth + 1)
+            finally:
+                frontier.task_done()
+
+    async def _crawl_page(self, session: aiohttp.ClientSession, url: str, depth: int, attempt: int = 0) -> List[str]:
+        """Fetch a single page and return the same-domain links found on it"""
+        previous = self.previous_state.get(url)
+        outcome = "error"
+        received = 0
+        start = None
+
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(url)
+            # Timed from here so waits for the rate limiter don't count as fetch latency
+            start = time.perf_counter()
+            async with session.get(url, headers=self._conditional_headers(previous)) as response:
+                if response.status in (429, 503) and self.rate_limiter is not None:
+                    outcome = "rate_limited"
+                    await self.rate_limiter.penalize(url, parse_retry_after(response.headers.get('retry-after')))
+                    if attempt >= RATE_LIMITED_RETRIES:
+                        return []
+                    # Free the connection while waiting out the backoff, then try again
+                    response.release()
+                    # The retry records its own fetch; don't count its time against this one
+                    CRAWLER_FETCH_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start)
+                    CRAWLER_FETCH_BYTES.labels(outcome=outcome).observe(0)
+                    start = None
+                    return await self._crawl_page(session, url, depth, attempt + 1)
+
+                if response.status == 304 and previous is not None:
+                    # Unchanged since the last crawl: reuse its link set
+                    outcome = "not_modified"
+                    self.not_modified_count += 1
+                    if not self._is_alias(url, previous.get('canonical_url')):
+                        self._mark_found(url, depth)
+                    self.page_states[url] = dict(previous)
+                    return list(previous.get('links') or [])
+
+                if response.status != 200:
+                    outcome = "http_error"
+                    return []
+
+                state = {
+                    'etag': response.headers.get('etag'),
+                    'last_modified': response.headers.get('last-modified'),
+                    'content_hash': None,
+                    'structure_hash': None,
+                    'canonical_url': None,
+                    'links': [],
+                }
+                self.page_states[url] = state
+
+                # Only crawl HTML pages; skip the body of anything else unread
+                content_type = response.headers.get('content-type', '')
+                if 'text/html' not in content_type:
+                    outcome = "not_html"
+                    self._mark_found(url, depth)
+                    return []
+
+                received = await self._parse_body(response, url, state)
+                outcome = "ok"
+                if not self._is_alias(url, state['canonical_url']):
+                    self._mark_found(url, depth)
+                return state['links']
+
         except Exception as e:
             logger.error(f"Error crawling {url}: {e}")
-    
-    async def _extract_links(self, session: aiohttp.ClientSession, html: str, base_url: str):
-        """Extract and crawl links from HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            full_url = urljoin(base_url, href)
-            
-            # Only crawl same domain links
-            if urlparse(full_url).netloc == self.domain:
-                # Remove fragments and query params for deduplication
-                clean_url = full_url.split('#')[0].split('?')[0]
-                
-                if clean_url not in self.visited_urls and len(self.found_urls) < self.max_pages:
-                    await self._crawl_page(session, clean_url)
\ No newline at end of file
+            return []
+        finally:
+            if start is not None:
+                CRAWLER_FETCH_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start)
+                CRAWLER_FETCH_BYTES.labels(outcome=outcome).observe(received)
+
+    async def _parse_body(self, response: aiohttp.ClientResponse, url: str, state: Dict[str, Any]) -> int:
+        """Stream an HTML body through the link extractor, hashing it as it goes.
+
+        Returns the number of body bytes read.
+        """
+        # Resolve relative links against where the page was actually served from
+        extractor = LinkExtractor(str(response.url))
+        decoder = make_decoder(response.charset)
+        hasher = hashlib.sha256()
+        received = 0
+
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            hasher.update(chunk)
+            extractor.feed(decoder.decode(chunk))
+            received += len(chunk)
+            if received >= self.max_body_bytes:
+                logger.warning(f"Body of {url} exceeds {self.max_body_bytes} bytes, truncating")
+                break
+
+        extractor.feed(decoder.decode(b'', final=True))
+        extractor.close()
+
+        links = [
+            link for link in map(self._clean_url, extractor.links)
+            if link is not None
+        ]
+        canonical = self._clean_url(extractor.canonical) if extractor.canonical else None
+        if canonical is not None:
+            links.append(canonical)
+
+        state['content_hash'] = hasher.hexdigest()
+        state['structure_hash'] = extractor.structure_fingerprint
+        state['canonical_url'] = canonical
+        state['links'] = links
+        return received
+
+    def _is_alias(self, url: str, canonical_url: Optional[str]) -> bool:
+        """A page whose canonical points elsewhere is audited under that URL instead"""
+        return canonical_url is not None and self._page_key(canonical_url) != self._page_key(url)
+
+    def _conditional_headers(self, previous: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from a prior crawl"""
+        headers = {}
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+
+    def _clean_url(self, url: str) -> Optional[str]:
+        """Return a same-domain URL without its fragment, None for others"""
+        if not url.lower().startswith(('http://', 'https://')):
+            return None
+        # Only crawl same domain links
+        if urlparse(self._page_key(url)).netloc != self.domain:
+            return None
+        return urldefrag(url.strip())[0]
+
+    def _page_key(self, url: str) -> str:
+        """Canonical form of a URL, under which aliases of the same page are deduplicated"""
+        return normalize_url(url, self.allowed_query_params)
+
+    def _ordered_results(self) -> List[str]:
+        """Return found pages ordered by crawl depth, then URL"""
+        ordered = sorted(
+            self.url_depths,
+            key=lambda url: (self.url_depths[url], url)
+        )
+        return ordered[:self.max_pages]
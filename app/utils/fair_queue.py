@@ -0,0 +1,226 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+import logging
+
+import redis
+
+from app.config.setting import settings
+
+logger = logging.getLogger(__name__)
+
+# Audit priorities, highest first
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+# Single-page audits skip the fair queue and have their own Celery queue
+LANE_INTERACTIVE = "interactive"
+
+# Broker message priority per level (the Redis transport treats 0 as highest)
+CELERY_PRIORITIES = {PRIORITY_HIGH: 0, PRIORITY_NORMAL: 3, PRIORITY_LOW: 6}
+# Share of the workers a run gets relative to other runs, as a multiple of the base window
+PRIORITY_WEIGHTS = {PRIORITY_HIGH: 2, PRIORITY_NORMAL: 1, PRIORITY_LOW: 1}
+
+BACKLOG_TTL_SECONDS = 7 * 24 * 3600
+QUEUE_WAIT_SAMPLES = 500
+
+# Drop expired leases, then pop as many backlog entries as the run's window allows, in one atomic step.
+# KEYS: state hash, backlog list of lease ids, payload hash, lease sorted set (score = expiry)
+# ARGV: finished lease id or "", window, key TTL, now, lease seconds
+_RELEASE_SCRIPT = """
+if ARGV[1] ~= '' then
+    redis.call('ZREM', KEYS[4], ARGV[1])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', ARGV[4])
+local inflight = redis.call('ZCARD', KEYS[4])
+local window = tonumber(redis.call('HGET', KEYS[1], 'window') or ARGV[2])
+local expires = tonumber(ARGV[4]) + tonumber(ARGV[5])
+local released = {}
+while inflight < window do
+    local lease_id = redis.call('LPOP', KEYS[2])
+    if not lease_id then break end
+    local item = redis.call('HGET', KEYS[3], lease_id)
+    redis.call('HDEL', KEYS[3], lease_id)
+    if item then
+        redis.call('ZADD', KEYS[4], expires, lease_id)
+        table.insert(released, item)
+        inflight = inflight + 1
+    end
+end
+for i = 1, 4 do
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return {released, inflight, redis.call('LLEN', KEYS[2])}
+"""
+
+
+def run_window(base_window: int, priority: str) -> int:
+    """Maximum batch tasks a run may have on the broker or running at once"""
+    return max(1, base_window * PRIORITY_WEIGHTS.get(priority, 1))
+
+
+class FairDispatcher:
+    """Weighted fair sharing of the page audit queue between audit runs.
+
+    The broker queue is FIFO, so a run that publishes 1,000 batches at once
+    makes every later run wait behind all of them. Instead each run keeps
+    its batches in a Redis backlog and only releases up to its window onto
+    the broker; every finished batch releases the next one. Runs therefore
+    take turns on the queue, and a run's share of the workers is
+    proportional to its window, which is weighted by priority.
+
+    Each released batch holds a lease on a window slot until it finishes.
+    Leases expire, so a batch lost with its worker frees its slot once
+    reap() runs, instead of holding the run's window forever.
+    """
+
+    RUNS_KEY = "audit:fair:runs"
+
+    def __init__(self, client: Optional[redis.Redis] = None, lease_seconds: float = 3600):
+        self.redis = client or redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379")
+        )
+        self.lease_seconds = lease_seconds
+        self._release = self.redis.register_script(_RELEASE_SCRIPT)
+
+    @staticmethod
+    def _state_key(run_id: int) -> str:
+        return f"audit:fair:run:{run_id}"
+
+    @staticmethod
+    def _backlog_key(run_id: int) -> str:
+        return f"audit:fair:run:{run_id}:backlog"
+
+    @staticmethod
+    def _payloads_key(run_id: int) -> str:
+        return f"audit:fair:run:{run_id}:payloads"
+
+    @staticmethod
+    def _leases_key(run_id: int) -> str:
+        return f"audit:fair:run:{run_id}:leases"
+
+    def submit(self, run_id: int, payloads: List[Dict[str, Any]], window: int) -> List[Dict[str, Any]]:
+        """Add task payloads to the run's backlog and return those that may be published now.
+
+        Each payload gets a "lease_id"; the task passes it back to release().
+        Raises redis.RedisError; callers should publish directly in that case.
+        """
+        for payload in payloads:
+            payload["lease_id"] = uuid.uuid4().hex
+        pipe = self.redis.pipeline()
+        pipe.hsetnx(self._state_key(run_id), "window", window)
+        pipe.hset(self._payloads_key(run_id), mapping={
+            payload["lease_id"]: json.dumps(payload) for payload in payloads
+        })
+        pipe.rpush(self._backlog_key(run_id), *[payload["lease_id"] for payload in payloads])
+        pipe.sadd(self.RUNS_KEY, run_id)
+        pipe.execute()
+        return self.release(run_id, lease_id=None, window=window)
+
+    def release(self, run_id: int, lease_id: Optional[str] = None, window: int = 1) -> List[Dict[str, Any]]:
+        """Free a finished batch's lease and return the backlog entries that may now be published"""
+        released, inflight, backlog = self._release(
+            keys=[self._state_key(run_id), self._backlog_key(run_id), self._payloads_key(run_id), self._leases_key(run_id)],
+            args=[lease_id or "", window, BACKLOG_TTL_SECONDS, time.time(), self.lease_seconds]
+        )
+        if not inflight and not backlog:
+            self.redis.srem(self.RUNS_KEY, run_id)
+        return [json.loads(item) for item in released]
+
+    def renew(self, run_id: int, lease_id: Optional[str], seconds: float):
+        """Extend a running batch's lease to cover its time limit.
+
+        Only existing leases are extended; one that already expired stays gone.
+        """
+        if not lease_id:
+            return
+        try:
+            self.redis.zadd(self._leases_key(run_id), {lease_id: time.time() + seconds}, xx=True)
+        except redis.RedisError as e:
+            logger.warning(f"Could not renew batch lease for run {run_id}: {e}")
+
+    def reap(self) -> List[Dict[str, Any]]:
+        """Drop expired leases of every active run and return the batches they make room for"""
+        ready = []
+        for run_id in self.redis.smembers(self.RUNS_KEY):
+            run_id = int(run_id)
+            window = int(self.redis.hget(self._state_key(run_id), "window") or 1)
+            ready.extend(self.release(run_id, lease_id=None, window=window))
+        return ready
+
+    def backlog(self, run_id: int) -> int:
+        try:
+            return self.redis.llen(self._backlog_key(run_id))
+        except redis.RedisError:
+            return 0
+
+
+class QueueWaitStats:
+    """Time audits spend queued before a worker starts them, per priority"""
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.redis = client or redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379")
+        )
+
+    @staticmethod
+    def _key(priority: str) -> str:
+        return f"audit:queue_wait:{priority}"
+
+    def record(self, priority: str, queued_at: Optional[float]):
+        if queued_at is None:
+            return
+        wait = max(0.0, time.time() - queued_at)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.lpush(self._key(priority), f"{wait:.3f}")
+            pipe.ltrim(self._key(priority), 0, QUEUE_WAIT_SAMPLES - 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not record queue wait for {priority} audits: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Sample count and p50/p95/max wait in seconds over recent tasks, per priority"""
+        lanes = PRIORITIES + (LANE_INTERACTIVE,)
+        try:
+            # All lanes in one round trip
+            pipe = self.redis.pipeline(transaction=False)
+            for priority in lanes:
+                pipe.lrange(self._key(priority), 0, -1)
+            raw = pipe.execute()
+        except redis.RedisError:
+            raw = [[] for _ in lanes]
+        stats = {}
+        for priority, values in zip(lanes, raw):
+            samples = sorted(float(value) for value in values)
+            if not samples:
+                stats[priority] = {"samples": 0, "p50": None, "p95": None, "max": None}
+                continue
+            stats[priority] = {
+                "samples": len(samples),
+                "p50": samples[int(0.5 * (len(samples) - 1))],
+                "p95": samples[int(0.95 * (len(samples) - 1))],
+                "max": samples[-1],
+            }
+        return stats
+
+
+_dispatcher: Optional[FairDispatcher] = None
+_wait_stats: Optional[QueueWaitStats] = None
+
+
+def get_fair_dispatcher() -> FairDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = FairDispatcher(lease_seconds=settings.FAIR_SHARE_LEASE_SECONDS)
+    return _dispatcher
+
+
+def get_queue_wait_stats() -> QueueWaitStats:
+    global _wait_stats
+    if _wait_stats is None:
+        _wait_stats = QueueWaitStats()
+    return _wait_stats
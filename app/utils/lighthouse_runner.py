@@ -1,76 +1,231 @@
 # lighthouse_runner.py
 import asyncio
+import hashlib
 import subprocess
 import json
 import os
+import signal
 import tempfile
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from app.config.setting import settings
+from app.utils.chrome_pool import get_chrome_pool
+from app.utils.audit_scheduler import AuditScheduler, get_audit_scheduler
+from app.utils.rate_limiter import OriginRateLimiter, get_rate_limiter
+from app.utils.metrics import LIGHTHOUSE_PHASE_SECONDS
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Lighthouse audit id -> metrics column, all read from the audit's numericValue
+METRIC_AUDITS = {
+    'largest-contentful-paint': 'lcp_ms',
+    'cumulative-layout-shift': 'cls',
+    'total-blocking-time': 'tbt_ms',
+    'first-contentful-paint': 'fcp_ms',
+    'speed-index': 'speed_index_ms',
+    'interactive': 'tti_ms',
+    'total-byte-weight': 'total_byte_weight',
+}
+
+# resource-summary resourceType values kept as count/bytes columns
+RESOURCE_TYPES = ['total', 'document', 'script', 'stylesheet', 'image', 'font', 'media', 'other', 'third-party']
+
+
+class LighthouseTimeoutError(Exception):
+    """Raised when a Lighthouse run exceeds its wall-clock timeout"""
+
+
 class LighthouseRunner:
-    def __init__(self):
+    def __init__(
+        self,
+        use_chrome_pool: Optional[bool] = None,
+        scheduler: Optional[AuditScheduler] = None,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[OriginRateLimiter] = None,
+        interactive: bool = False,
+    ):
         self.reports_dir = "/app/reports"
         os.makedirs(self.reports_dir, exist_ok=True)
-    
+        self.timeout = timeout or settings.LIGHTHOUSE_TIMEOUT_SECONDS
+        # Running Lighthouse processes (pid -> report path), for emergency cleanup
+        self._active: Dict[int, str] = {}
+        if use_chrome_pool is None:
+            use_chrome_pool = settings.LIGHTHOUSE_USE_CHROME_POOL
+        self.use_chrome_pool = use_chrome_pool
+        # Per-origin throttle shared with crawls; a run costs LIGHTHOUSE_RATE_LIMIT_COST tokens
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Shared by all runners in the process and, through its host slots, across processes
+        self.scheduler = scheduler or get_audit_scheduler()
+        # Single-page audits may use the host slots reserved for them
+        self.interactive = interactive
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of audits waiting for the scheduler to admit them"""
+        return self.scheduler.queue_depth
+
+    async def run_audits(self, targets: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Run Lighthouse on several (url, device_type) pairs concurrently"""
+        return await asyncio.gather(
+            *(self.run_audit(url, device_type) for url, device_type in targets)
+        )
+
     async def run_audit(self, url: str, device_type: str = "desktop") -> Optional[Dict[str, Any]]:
-        """Run Lighthouse audit on a single URL"""
+        """Run Lighthouse audit on a single URL once the origin and the scheduler allow it"""
+        # Wait for the origin before taking a slot, so throttled sites don't hold CPU slots
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(url, cost=settings.LIGHTHOUSE_RATE_LIMIT_COST)
+        async with self.scheduler.slot(interactive=self.interactive):
+            return await self._run_audit(url, device_type)
+
+    async def _run_audit(self, url: str, device_type: str) -> Optional[Dict[str, Any]]:
+        try:
+            if not self.use_chrome_pool:
+                return await self._run_lighthouse(url, device_type)
+
+            pool = get_chrome_pool(
+                settings.CHROME_POOL_SIZE,
+                settings.CHROME_MAX_AUDITS_PER_INSTANCE,
+                settings.CHROME_PATH
+            )
+            # A timed-out run leaves the pooled Chrome in an unknown state, so it is recycled
+            async with pool.instance() as chrome:
+                return await self._run_lighthouse(url, device_type, port=chrome.port)
+        except LighthouseTimeoutError:
+            logger.error(f"Lighthouse timed out after {self.timeout}s for {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error running Lighthouse for {url}: {e}")
+            return None
+
+    def _build_command(self, url: str, device_type: str, output_file: str, port: Optional[int] = None) -> List[str]:
+        """Build the Lighthouse CLI invocation"""
+        cmd = [
+            'lighthouse',
+            url,
+            '--output=json',
+            f'--output-path={output_file}',
+            '--no-enable-error-reporting',
+            '--quiet'
+        ]
+
+        if port is not None:
+            # Attach to an already running pooled Chrome instead of launching one
+            cmd.append(f'--port={port}')
+        else:
+            cmd.append('--chrome-flags=--headless --no-sandbox --disable-dev-shm-usage')
+
+        # Add device emulation
+        if device_type == "mobile":
+            cmd.extend([
+                '--preset=perf',
+                '--emulated-form-factor=mobile',
+                '--throttling-method=simulate'
+            ])
+        else:
+            cmd.extend([
+                '--preset=perf',
+                '--emulated-form-factor=desktop',
+                '--throttling-method=simulate'
+            ])
+
+        return cmd
+
+    def config_fingerprint(self, device_type: str) -> str:
+        """Hash of everything besides the page that shapes a report, for result caching"""
+        # Placeholders keep the hash independent of the URL, temp file and Chrome port
+        cmd = self._build_command('{url}', device_type, '{output}')
+        cmd.append(f'--config-version={settings.AUDIT_CACHE_CONFIG_VERSION}')
+        return hashlib.sha256('\0'.join(cmd).encode('utf-8')).hexdigest()
+
+    async def _run_lighthouse(self, url: str, device_type: str, port: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Run the Lighthouse CLI once and return the parsed report"""
+        output_file = None
+        process = None
+        outcome = "error"
+        phases: Dict[str, float] = {}
+
         try:
             # Create temporary file for the report
             with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
                 output_file = f.name
             
-            # Configure Lighthouse command
-            cmd = [
-                'lighthouse',
-                url,
-                '--output=json',
-                f'--output-path={output_file}',
-                '--chrome-flags=--headless --no-sandbox --disable-dev-shm-usage',
-                '--no-enable-error-reporting',
-                '--quiet'
-            ]
+            cmd = self._build_command(url, device_type, output_file, port)
             
-            # Add device emulation
-            if device_type == "mobile":
-                cmd.extend([
-                    '--preset=perf',
-                    '--emulated-form-factor=mobile',
-                    '--throttling-method=simulate'
-                ])
-            else:
-                cmd.extend([
-                    '--preset=perf',
-                    '--emulated-form-factor=desktop',
-                    '--throttling-method=simulate'
-                ])
-            
-            # Run Lighthouse
+            # Run Lighthouse in its own process group so Chrome children can be killed with it
+            start = time.perf_counter()
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
             )
+            phases['spawn'] = time.perf_counter() - start
+            self._active[process.pid] = output_file
             
-            stdout, stderr = await process.communicate()
+            start = time.perf_counter()
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                raise LighthouseTimeoutError(url)
+            finally:
+                phases['run'] = time.perf_counter() - start
             
             if process.returncode == 0:
                 # Read the report
+                start = time.perf_counter()
                 with open(output_file, 'r') as f:
                     report = json.load(f)
-                
-                # Clean up temporary file
-                os.unlink(output_file)
-                
+                phases['parse'] = time.perf_counter() - start
+                outcome = "success"
                 return report
             else:
+                outcome = "failed"
                 logger.error(f"Lighthouse failed for {url}: {stderr.decode()}")
                 return None
-                
-        except Exception as e:
-            logger.error(f"Error running Lighthouse for {url}: {e}")
-            return None
+
+        finally:
+            for phase, seconds in phases.items():
+                LIGHTHOUSE_PHASE_SECONDS.labels(phase=phase, device_type=device_type, outcome=outcome).observe(seconds)
+            if process is not None:
+                self._active.pop(process.pid, None)
+                await self._reap(process)
+            if output_file is not None:
+                self._remove_file(output_file)
+
+    async def _reap(self, process: asyncio.subprocess.Process):
+        """Kill whatever is left of a Lighthouse process group and collect its exit status"""
+        self._kill_group(process.pid)
+        if process.returncode is None:
+            await process.wait()
+
+    def kill_all(self):
+        """Synchronously kill every running Lighthouse process and remove its report file.
+
+        Used as a last resort when a task is interrupted (e.g. by a Celery soft
+        time limit) while its event loop can no longer run cleanup coroutines.
+        """
+        for pid, output_file in list(self._active.items()):
+            self._kill_group(pid)
+            self._remove_file(output_file)
+        self._active.clear()
+
+    @staticmethod
+    def _kill_group(pid: int):
+        # Also sweeps Chrome children that outlived a normally exiting Lighthouse
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
     
     def extract_scores(self, report: Dict[str, Any]) -> Dict[str, float]:
         """Extract scores from Lighthouse report"""
@@ -84,6 +239,33 @@ class LighthouseRunner:
             'pwa': self._get_score(categories.get('pwa'))
         }
     
+    def extract_metrics(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract Core Web Vitals and resource-summary totals from a Lighthouse report"""
+        audits = report.get('audits', {})
+        metrics: Dict[str, Any] = {}
+        
+        for audit_id, column in METRIC_AUDITS.items():
+            value = (audits.get(audit_id) or {}).get('numericValue')
+            metrics[column] = float(value) if value is not None else None
+        if metrics['total_byte_weight'] is not None:
+            metrics['total_byte_weight'] = int(metrics['total_byte_weight'])
+        
+        for resource_type in RESOURCE_TYPES:
+            prefix = resource_type.replace('-', '_')
+            metrics[f'{prefix}_requests'] = None
+            metrics[f'{prefix}_bytes'] = None
+        
+        details = (audits.get('resource-summary') or {}).get('details') or {}
+        for item in details.get('items') or []:
+            resource_type = item.get('resourceType')
+            if resource_type not in RESOURCE_TYPES:
+                continue
+            prefix = resource_type.replace('-', '_')
+            metrics[f'{prefix}_requests'] = item.get('requestCount')
+            metrics[f'{prefix}_bytes'] = item.get('transferSize')
+        
+        return metrics
+    
     def _get_score(self, category: Optional[Dict]) -> Optional[float]:
         """Extract score from category, convert to percentage"""
         if category and 'score' in category and category['score'] is not None:
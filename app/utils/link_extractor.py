@@ -0,0 +1,109 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from typing import List, Optional, Tuple
+import codecs
+import hashlib
+import re
+
+# Elements this deep or shallower (<html> is 1) make up the structure fingerprint
+STRUCTURE_DEPTH = 5
+# Stop fingerprinting after this many elements, the rest of the page adds little
+MAX_STRUCTURE_TOKENS = 2000
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+_DIGITS = re.compile(r'\d+')
+
+
+class LinkExtractor(HTMLParser):
+    """Incremental <a href> extractor that can be fed an HTML body chunk by chunk.
+
+    Unlike a full DOM parse it keeps no tree around, and the contents of
+    <script>/<style> are skipped by the tokenizer rather than parsed. It also
+    hashes the page's outer element skeleton (tag, id and first class of the
+    top STRUCTURE_DEPTH levels, with repeated siblings collapsed and digits
+    dropped) so pages built from the same template share a fingerprint.
+    """
+
+    def __init__(self, page_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = page_url
+        self.links: List[str] = []
+        self.canonical: Optional[str] = None
+        self._base_seen = False
+        self._open_tags: List[str] = []
+        self._last_token: List[Optional[str]] = [None] * (STRUCTURE_DEPTH + 1)
+        self._structure = hashlib.sha1()
+        self._structure_tokens = 0
+
+    @property
+    def structure_fingerprint(self) -> Optional[str]:
+        if self._structure_tokens == 0:
+            return None
+        return self._structure.hexdigest()[:16]
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self._track_structure(tag, attrs)
+
+        if tag == 'a':
+            href = self._attr(attrs, 'href')
+            if href:
+                self.links.append(urljoin(self.base_url, href))
+        elif tag == 'base' and not self._base_seen:
+            # Only the first <base href> counts, and it applies to later links
+            href = self._attr(attrs, 'href')
+            if href:
+                self.base_url = urljoin(self.base_url, href)
+                self._base_seen = True
+        elif tag == 'link' and self.canonical is None:
+            rel = (self._attr(attrs, 'rel') or '').lower().split()
+            href = self._attr(attrs, 'href')
+            if 'canonical' in rel and href:
+                self.canonical = urljoin(self.base_url, href)
+
+    def handle_endtag(self, tag: str):
+        # Tolerate unclosed elements by popping back to the matching open tag
+        if tag in self._open_tags:
+            while self._open_tags and self._open_tags.pop() != tag:
+                pass
+
+    def _track_structure(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        depth = len(self._open_tags) + 1
+        if depth <= STRUCTURE_DEPTH and self._structure_tokens < MAX_STRUCTURE_TOKENS:
+            element_id = _DIGITS.sub('', self._attr(attrs, 'id') or '')
+            classes = (self._attr(attrs, 'class') or '').split()
+            first_class = _DIGITS.sub('', classes[0]) if classes else ''
+            token = f"{depth}:{tag}#{element_id}.{first_class}"
+            # Lists of the same element count once, so item counts don't matter
+            if token != self._last_token[depth]:
+                self._last_token[depth] = token
+                self._structure.update(token.encode('utf-8'))
+                self._structure.update(b'\n')
+                self._structure_tokens += 1
+
+        if tag not in VOID_ELEMENTS:
+            self._open_tags.append(tag)
+            self._reset_children()
+
+    def _reset_children(self):
+        # A new parent starts a fresh sibling run for its children
+        depth = len(self._open_tags) + 1
+        if depth <= STRUCTURE_DEPTH:
+            self._last_token[depth] = None
+
+    @staticmethod
+    def _attr(attrs: List[Tuple[str, Optional[str]]], name: str) -> Optional[str]:
+        for key, value in attrs:
+            if key == name:
+                return value.strip() if value else value
+        return None
+
+
+def make_decoder(charset: Optional[str]):
+    """Return an incremental decoder for a response charset, defaulting to UTF-8"""
+    try:
+        codec = codecs.lookup(charset or 'utf-8')
+    except LookupError:
+        codec = codecs.lookup('utf-8')
+    return codec.incrementaldecoder(errors='replace')
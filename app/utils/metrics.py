@@ -0,0 +1,233 @@
+import os
+import re
+import shutil
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Set when several processes (uvicorn or Celery prefork workers) share one exporter
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Per-process files of livesum/liveall/... gauges, e.g. gauge_livesum_1234.db
+_LIVE_GAUGE_FILE = re.compile(r"^gauge_live\w+_(\d+)\.db$")
+
+CRAWLER_FETCH_SECONDS = Histogram(
+    "audit_crawler_fetch_seconds",
+    "Time to fetch and parse one page while crawling",
+    ["outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+CRAWLER_FETCH_BYTES = Histogram(
+    "audit_crawler_fetch_bytes",
+    "Body bytes read per crawled page",
+    ["outcome"],
+    buckets=(1024, 8192, 32768, 131072, 524288, 2097152, 8388608)
+)
+CRAWL_PAGES_DISCOVERED = Histogram(
+    "audit_crawl_pages_discovered",
+    "Pages found per crawl",
+    ["outcome"],
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+LIGHTHOUSE_PHASE_SECONDS = Histogram(
+    "audit_lighthouse_phase_seconds",
+    "Wall time of a Lighthouse run, by phase (spawn, run, parse)",
+    ["phase", "device_type", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 20, 30, 60, 120, 300)
+)
+LIGHTHOUSE_QUEUE_DEPTH = Gauge(
+    "audit_lighthouse_queue_depth",
+    "Lighthouse runs waiting for admission by the audit scheduler",
+    multiprocess_mode="livesum"
+)
+REPORT_SIZE_BYTES = Histogram(
+    "audit_report_size_bytes",
+    "Uncompressed size of Lighthouse reports put in the report store",
+    ["device_type", "outcome"],
+    buckets=(16384, 65536, 131072, 262144, 524288, 1048576, 2097152, 4194304, 8388608)
+)
+CELERY_QUEUE_WAIT_SECONDS = Histogram(
+    "audit_celery_queue_wait_seconds",
+    "Time a task spent on the broker before a worker started it",
+    ["queue"],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600)
+)
+CELERY_TASK_SECONDS = Histogram(
+    "audit_celery_task_seconds",
+    "Task runtime on the worker",
+    ["queue", "task", "outcome"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 900, 1800, 3600)
+)
+DB_QUERY_SECONDS = Histogram(
+    "audit_db_query_seconds",
+    "Database statement time, by API route or Celery task",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "audit_http_request_seconds",
+    "API request latency",
+    ["route", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+# What the current request or task is, for labelling database queries
+_route: ContextVar[Optional[Any]] = ContextVar("metrics_route", default=None)
+# Celery task id -> (start time, queue, route token) while the task runs
+_running_tasks: Dict[str, Tuple[float, str, Any]] = {}
+
+
+def set_route(route: Any):
+    """Label this context's queries with a route name, or an ASGI scope resolved lazily"""
+    return _route.set(route)
+
+
+def reset_route(token):
+    _route.reset(token)
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """Route template for an ASGI scope, e.g. /api/v1/audit/audit/{website_id}/status"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return scope.get("root_path", "") + path
+    # Unmatched paths are not used as labels, so clients can't create unbounded series
+    return "unmatched"
+
+
+def current_route() -> str:
+    route = _route.get()
+    if route is None:
+        return "other"
+    if isinstance(route, dict):
+        return route_label(route)
+    return route
+
+
+def instrument_engine(engine: Engine):
+    """Time every statement run on the engine into DB_QUERY_SECONDS"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _observe(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_start")
+        if started:
+            DB_QUERY_SECONDS.labels(route=current_route()).observe(time.perf_counter() - started.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+def registry() -> CollectorRegistry:
+    """The registry to expose: aggregated over all processes in multiprocess mode"""
+    if os.getenv(MULTIPROC_DIR_ENV):
+        collector_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collector_registry)
+        return collector_registry
+    return REGISTRY
+
+
+def render_latest():
+    """Body and content type of a /metrics response"""
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+def reset_multiprocess_dir():
+    """Remove metric files left by a previous run; call before worker processes start"""
+    path = os.getenv(MULTIPROC_DIR_ENV)
+    if not path:
+        return
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def mark_process_dead(pid: Optional[int] = None):
+    """Drop a worker process's live gauge files so livesum gauges stop counting it"""
+    if os.getenv(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def mark_dead_processes():
+    """Drop the live gauge files of processes that exited without cleaning up.
+
+    Pool children killed by a hard time limit never run their shutdown
+    handler, so each new child sweeps up after the ones it replaces.
+    """
+    path = os.getenv(MULTIPROC_DIR_ENV)
+    if not path:
+        return
+    for filename in os.listdir(path):
+        match = _LIVE_GAUGE_FILE.match(filename)
+        if not match:
+            continue
+        pid = int(match.group(1))
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid, path)
+        except PermissionError:
+            pass
+
+
+def start_exporter(port: int):
+    """Serve /metrics from a background thread, e.g. in a Celery worker"""
+    try:
+        start_http_server(port, registry=registry())
+        logger.info(f"Serving metrics on port {port}")
+    except OSError as e:
+        logger.warning(f"Could not start metrics exporter on port {port}: {e}")
+
+
+def _task_queue(task) -> str:
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key") or "celery"
+
+
+def task_started(task_id: str, task):
+    """Record a task's time on the broker and start timing its run"""
+    request = task.request
+    queue = _task_queue(task)
+    published_at = getattr(request, "published_at", None) or (getattr(request, "headers", None) or {}).get("published_at")
+    if published_at:
+        CELERY_QUEUE_WAIT_SECONDS.labels(queue=queue).observe(max(0.0, time.time() - float(published_at)))
+    _running_tasks[task_id] = (time.perf_counter(), queue, set_route(f"task:{task.name}"))
+
+
+def task_finished(task_id: str, task, retval: Any, state: Optional[str]):
+    running = _running_tasks.pop(task_id, None)
+    if running is None:
+        return
+    start, queue, token = running
+    # Tasks report handled errors in their return value rather than by raising
+    if isinstance(retval, dict) and retval.get("status"):
+        outcome = str(retval["status"])
+    else:
+        outcome = (state or "unknown").lower()
+    CELERY_TASK_SECONDS.labels(queue=queue, task=task.name, outcome=outcome).observe(time.perf_counter() - start)
+    try:
+        reset_route(token)
+    except ValueError:
+        # Token from another context, e.g. a task run eagerly on another thread
+        pass
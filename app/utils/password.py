@@ -1,13 +1,17 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Depends, HTTPException
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from app.config.setting import settings
-from sqlalchemy.orm import Session
-from app.config.base import get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.base import get_async_db
 from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
+from app.utils.user_cache import get_user_cache
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -15,6 +19,12 @@ ALGORITHM = settings.ALGORITHM
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL while hashing, so a small thread pool runs hashes in
+# parallel and keeps them off the event loop; the bound caps CPU spent on logins
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS), thread_name_prefix="bcrypt"
+)
+
 
 def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,6 +34,18 @@ def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """verify_password on the bcrypt thread pool, for use in async handlers"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str):
+    """get_password_hash on the bcrypt thread pool, for use in async handlers"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data
     if expires_delta:
@@ -36,7 +58,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ):
     credentials_exception = HTTPException(
         status_code=401,
@@ -51,8 +73,25 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    cache = get_user_cache()
+    user = cache.get(email)
     if user is None:
-        raise credentials_exception
+        user = await db.scalar(select(User).where(User.email == email))
+        if user is None or not user.is_active:
+            raise credentials_exception
+        cache.put(email, user)
 
     return user  # Return the full user object instead of just payload
+
+
+@event.listens_for(User.is_active, "set")
+def _invalidate_on_deactivation(target, value, oldvalue, initiator):
+    """Stop trusting a cached user as soon as it is deactivated in this process"""
+    if value != oldvalue:
+        get_user_cache().invalidate(target.email)
+
+
+@event.listens_for(User.email, "set")
+def _invalidate_on_email_change(target, value, oldvalue, initiator):
+    if value != oldvalue and isinstance(oldvalue, str):
+        get_user_cache().invalidate(oldvalue)
@@ -0,0 +1,158 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import logging
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TTL_SECONDS = 7 * 24 * 3600
+# Number of recent completion events used to estimate the audit rate
+RATE_WINDOW = 50
+STATES = ("pending", "running", "completed", "failed")
+
+
+class AuditProgress:
+    """Per-run audit progress kept as Redis counters.
+
+    Page tasks move counts between pending -> running -> completed/failed,
+    so the status endpoint can read progress in O(1) instead of counting
+    rows. Redis errors are logged and swallowed: progress is advisory and
+    must never fail an audit.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.redis = client or redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379")
+        )
+
+    @staticmethod
+    def _key(run_id: int) -> str:
+        return f"audit:progress:run:{run_id}"
+
+    @staticmethod
+    def _events_key(run_id: int) -> str:
+        return f"audit:progress:run:{run_id}:events"
+
+    def reset(self, run_id: int):
+        """Start a fresh progress record for a new audit run"""
+        try:
+            pipe = self.redis.pipeline()
+            pipe.delete(self._key(run_id), self._events_key(run_id))
+            pipe.hset(self._key(run_id), mapping={state: 0 for state in STATES})
+            pipe.expire(self._key(run_id), PROGRESS_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not reset audit progress for run {run_id}: {e}")
+
+    def add_pending(self, run_id: int, count: int):
+        self._increment(run_id, {"pending": count})
+
+    def start(self, run_id: int, count: int = 1):
+        self._increment(run_id, {"pending": -count, "running": count})
+
+    def finish(self, run_id: int, completed: int = 0, failed: int = 0):
+        """Record finished audits and remember when they finished for the ETA"""
+        self._increment(
+            run_id,
+            {"running": -(completed + failed), "completed": completed, "failed": failed},
+            finished=completed + failed
+        )
+
+    def _increment(self, run_id: int, deltas: Dict[str, int], finished: int = 0):
+        try:
+            pipe = self.redis.pipeline()
+            for state, delta in deltas.items():
+                if delta:
+                    pipe.hincrby(self._key(run_id), state, delta)
+            pipe.expire(self._key(run_id), PROGRESS_TTL_SECONDS)
+            if finished:
+                events_key = self._events_key(run_id)
+                pipe.lpush(events_key, f"{time.time()}:{finished}")
+                pipe.ltrim(events_key, 0, RATE_WINDOW - 1)
+                pipe.expire(events_key, PROGRESS_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not update audit progress for run {run_id}: {e}")
+
+    def mark_dispatch_complete(self, run_id: int):
+        """Record that every page audit for this run has been queued"""
+        try:
+            self.redis.hset(self._key(run_id), "dispatch_complete", 1)
+        except redis.RedisError as e:
+            logger.warning(f"Could not update audit progress for run {run_id}: {e}")
+
+    def claim_finalization(self, run_id: int) -> bool:
+        """Return True exactly once, when all queued audits have finished.
+
+        Pending counts are added before each batch is published and
+        dispatch_complete is only set after the last one, so once it is set
+        and nothing is pending or running the run is over. HSETNX makes sure
+        only one caller wins the race to finalize.
+        """
+        try:
+            raw = self.redis.hgetall(self._key(run_id))
+            counts = {key.decode(): int(value) for key, value in raw.items()}
+            if not counts.get("dispatch_complete") or counts.get("finalized"):
+                return False
+            if counts.get("pending", 0) > 0 or counts.get("running", 0) > 0:
+                return False
+            return bool(self.redis.hsetnx(self._key(run_id), "finalized", 1))
+        except redis.RedisError as e:
+            logger.warning(f"Could not check audit completion for run {run_id}: {e}")
+            return False
+
+    def get(self, run_id: int) -> Optional[Dict[str, int]]:
+        """Return the counters, or None if no progress is recorded (or Redis is down)"""
+        try:
+            raw = self.redis.hgetall(self._key(run_id))
+        except redis.RedisError as e:
+            logger.warning(f"Could not read audit progress for run {run_id}: {e}")
+            return None
+        if not raw:
+            return None
+        counts = {key.decode(): int(value) for key, value in raw.items()}
+        return {state: max(0, counts.get(state, 0)) for state in STATES}
+
+    def audits_per_second(self, run_id: int) -> Optional[float]:
+        """Recent audit completion rate, from the last RATE_WINDOW finish events"""
+        try:
+            events = self.redis.lrange(self._events_key(run_id), 0, -1)
+        except redis.RedisError:
+            return None
+        if len(events) < 2:
+            return None
+
+        parsed = []
+        for event in events:
+            timestamp, _, count = event.decode().partition(':')
+            parsed.append((float(timestamp), int(count)))
+
+        # Events are newest first; the oldest event only marks the window start
+        newest, oldest = parsed[0][0], parsed[-1][0]
+        elapsed = newest - oldest
+        if elapsed <= 0:
+            return None
+        return sum(count for _, count in parsed[:-1]) / elapsed
+
+    def estimate_completion(self, run_id: int, counts: Dict[str, int]) -> Optional[datetime]:
+        """Estimate when the remaining audits will be done at the recent rate"""
+        remaining = counts["pending"] + counts["running"]
+        if remaining == 0:
+            return None
+        rate = self.audits_per_second(run_id)
+        if not rate:
+            return None
+        return datetime.utcnow() + timedelta(seconds=remaining / rate)
+
+
+_progress: Optional[AuditProgress] = None
+
+
+def get_progress() -> AuditProgress:
+    global _progress
+    if _progress is None:
+        _progress = AuditProgress()
+    return _progress
@@ -0,0 +1,216 @@
+import asyncio
+import os
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+import redis
+import redis.asyncio
+
+from app.config.setting import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_TTL_SECONDS = 3600
+# Never honour a Retry-After longer than this
+MAX_RETRY_AFTER_SECONDS = 600
+
+# Reserve tokens from an origin's bucket. Tokens may go negative: the caller
+# then sleeps until its reservation is covered, so concurrent callers queue
+# up instead of polling. Returns {granted, wait_seconds}; granted is 0 while
+# the origin is blocked by Retry-After, and the caller must ask again.
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local base_rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local recovery = tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate', 'max_rate', 'max_burst', 'blocked_until')
+local max_rate = math.min(base_rate, tonumber(state[4]) or base_rate)
+burst = math.min(burst, tonumber(state[5]) or burst)
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local rate = tonumber(state[3]) or max_rate
+local blocked_until = tonumber(state[6]) or 0
+if now < blocked_until then
+    return {0, tostring(blocked_until - now)}
+end
+local elapsed = math.max(0, now - ts)
+-- After a backoff the rate climbs back linearly to the allowed rate
+if rate < max_rate then
+    rate = math.min(max_rate, rate + max_rate * elapsed / recovery)
+end
+rate = math.min(rate, max_rate)
+tokens = math.min(burst, tokens + elapsed * rate) - cost
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now, 'rate', rate)
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return {1, tostring(wait)}
+"""
+
+# Halve the origin's rate and optionally block it until Retry-After has passed
+_PENALIZE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate') or ARGV[2])
+rate = math.max(tonumber(ARGV[3]), rate * tonumber(ARGV[4]))
+redis.call('HSET', KEYS[1], 'rate', rate)
+local retry_after = tonumber(ARGV[5])
+if retry_after > 0 then
+    local blocked_until = now + retry_after
+    local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until') or '0')
+    if blocked_until > current then
+        redis.call('HSET', KEYS[1], 'blocked_until', blocked_until)
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return tostring(rate)
+"""
+
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER_SECONDS)
+
+
+class OriginRateLimiter:
+    """Cluster-wide token bucket per target origin, shared through Redis.
+
+    Crawler fetches and Lighthouse runs take tokens from the same bucket,
+    so the total load all workers put on one site stays under the configured
+    rate however many workers there are. Robots.txt Crawl-delay lowers an
+    origin's rate, 429/503 responses halve it (recovering linearly over
+    recovery_seconds) and Retry-After pauses the origin entirely. Redis
+    errors are logged and let the request through: protecting the target
+    site is best effort and must not fail audits.
+
+    Redis is called with the asyncio client, so waiting on it never blocks
+    the crawler's event loop. Asyncio connections belong to one loop, so
+    without an explicit client each event loop gets its own.
+    """
+
+    def __init__(
+        self,
+        client: Optional[redis.asyncio.Redis] = None,
+        rate: float = 2.0,
+        burst: float = 5.0,
+        min_rate: float = 0.1,
+        recovery_seconds: float = 60.0,
+    ):
+        # (client, acquire script, penalize script), per event loop unless a client was given
+        self._fixed = self._bind(client) if client is not None else None
+        self._per_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple]" = weakref.WeakKeyDictionary()
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.min_rate = min_rate
+        self.recovery_seconds = recovery_seconds
+
+    @staticmethod
+    def _bind(client: redis.asyncio.Redis) -> Tuple:
+        return client, client.register_script(_ACQUIRE_SCRIPT), client.register_script(_PENALIZE_SCRIPT)
+
+    def _redis(self) -> Tuple:
+        """Client and scripts for the running event loop"""
+        if self._fixed is not None:
+            return self._fixed
+        loop = asyncio.get_running_loop()
+        bound = self._per_loop.get(loop)
+        if bound is None:
+            bound = self._bind(redis.asyncio.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379")))
+            self._per_loop[loop] = bound
+        return bound
+
+    @staticmethod
+    def _key(origin: str) -> str:
+        return f"ratelimit:origin:{origin}"
+
+    async def acquire(self, url: str, cost: float = 1.0):
+        """Wait until the URL's origin has capacity for a request of the given cost"""
+        key = self._key(origin_of(url))
+        _, acquire_script, _ = self._redis()
+        while True:
+            try:
+                granted, wait = await acquire_script(
+                    keys=[key],
+                    args=[time.time(), self.rate, self.burst, cost, self.recovery_seconds, STATE_TTL_SECONDS]
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Rate limiter unavailable, not throttling {url}: {e}")
+                return
+            wait = float(wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if int(granted):
+                return
+
+    async def penalize(self, url: str, retry_after: Optional[float] = None, factor: float = 0.5):
+        """Back off an origin that answered 429/503, pausing it for Retry-After if given"""
+        origin = origin_of(url)
+        _, _, penalize_script = self._redis()
+        try:
+            rate = await penalize_script(
+                keys=[self._key(origin)],
+                args=[time.time(), self.rate, self.min_rate, factor, retry_after or 0, STATE_TTL_SECONDS]
+            )
+            logger.warning(
+                f"Backing off {origin}: rate now {float(rate):.2f}/s"
+                + (f", paused for {retry_after:.0f}s" if retry_after else "")
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Could not record backoff for {origin}: {e}")
+
+    async def set_crawl_delay(self, url: str, delay: float):
+        """Cap an origin's rate at one request per Crawl-delay seconds"""
+        if delay <= 0:
+            return
+        key = self._key(origin_of(url))
+        client, _, _ = self._redis()
+        try:
+            pipe = client.pipeline()
+            pipe.hset(key, mapping={"max_rate": 1.0 / delay, "max_burst": 1})
+            pipe.expire(key, STATE_TTL_SECONDS)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not apply Crawl-delay for {url}: {e}")
+
+
+_limiter: Optional[OriginRateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[OriginRateLimiter]:
+    """Return the limiter configured in Settings, or None when rate limiting is off"""
+    global _limiter
+    if settings.ORIGIN_RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    if _limiter is None:
+        _limiter = OriginRateLimiter(
+            rate=settings.ORIGIN_RATE_LIMIT_PER_SECOND,
+            burst=settings.ORIGIN_RATE_LIMIT_BURST,
+            min_rate=settings.ORIGIN_RATE_LIMIT_MIN_PER_SECOND,
+            recovery_seconds=settings.ORIGIN_RATE_LIMIT_RECOVERY_SECONDS
+        )
+    return _limiter
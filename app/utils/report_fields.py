@@ -0,0 +1,39 @@
+from typing import Any, Dict, List
+
+_MISSING = object()
+
+
+def parse_fields(fields: str) -> List[str]:
+    """Split a comma-separated fields parameter into individual field paths"""
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def _path_tokens(path: str) -> List[str]:
+    # "/audits/largest-contentful-paint" is a JSON pointer (RFC 6901),
+    # "audits.largest-contentful-paint" the dotted shorthand
+    if path.startswith('/'):
+        return [
+            token.replace('~1', '/').replace('~0', '~')
+            for token in path[1:].split('/')
+        ]
+    return path.split('.')
+
+
+def resolve_path(document: Any, path: str) -> Any:
+    """Resolve a JSON pointer or dotted path, returning None when absent"""
+    current = document
+    for token in _path_tokens(path):
+        if isinstance(current, dict):
+            current = current.get(token, _MISSING)
+        elif isinstance(current, list) and token.isdigit() and int(token) < len(current):
+            current = current[int(token)]
+        else:
+            current = _MISSING
+        if current is _MISSING:
+            return None
+    return current
+
+
+def extract_fields(report: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Return {path: value} for each requested path in the report"""
+    return {path: resolve_path(report, path) for path in fields}
@@ -0,0 +1,234 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional
+import logging
+
+from app.config.setting import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+ENCODING_ZSTD = "zstd"
+ENCODING_GZIP = "gzip"
+_EXTENSIONS = {ENCODING_ZSTD: "zst", ENCODING_GZIP: "gz"}
+
+
+class ReportNotFoundError(Exception):
+    """Raised when a report key has no stored object"""
+
+
+def encoding_for_key(key: str) -> str:
+    """Return the compression encoding of a stored report from its key"""
+    return ENCODING_ZSTD if key.endswith(".zst") else ENCODING_GZIP
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == ENCODING_ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == ENCODING_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ReportStore(ABC):
+    """Content-addressed store for compressed Lighthouse reports.
+
+    Reports are serialized to compact JSON, keyed by the SHA-256 of those
+    bytes and written compressed, so identical reports are stored once.
+    Backends only need to implement raw byte access.
+    """
+
+    def __init__(self, encoding: str = ENCODING_ZSTD):
+        if encoding == ENCODING_ZSTD and zstandard is None:
+            logger.warning("zstandard is not installed, storing reports with gzip")
+            encoding = ENCODING_GZIP
+        self.encoding = encoding
+
+    def put(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a report and return its key, uncompressed size and hash"""
+        data = json.dumps(report, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest[:2]}/{digest}.json.{_EXTENSIONS[self.encoding]}"
+
+        if not self._exists(key):
+            self._write(key, _compress(data, self.encoding))
+
+        return {"key": key, "size": len(data), "hash": digest}
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """Load and decompress a stored report"""
+        data = b"".join(self.iter_compressed(key))
+        return json.loads(_decompress(data, encoding_for_key(key)))
+
+    @abstractmethod
+    def iter_compressed(self, key: str) -> Iterator[bytes]:
+        """Open a report and return an iterator over its stored (still compressed) bytes.
+
+        The object is opened before returning, so a missing report raises
+        ReportNotFoundError here rather than part way through a response.
+        """
+
+    def iter_decompressed(self, key: str) -> Iterator[bytes]:
+        """Open a report and return an iterator over its JSON bytes, decompressed chunk by chunk"""
+        return self._decompress_chunks(self.iter_compressed(key), encoding_for_key(key))
+
+    @staticmethod
+    def _decompress_chunks(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+        if encoding == ENCODING_ZSTD:
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        for chunk in chunks:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a stored report"""
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        """Whether a report with this key is already stored"""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes):
+        """Store compressed report bytes under a key"""
+
+
+class LocalReportStore(ReportStore):
+    """Reports stored as files under a local directory (e.g. the /app/reports volume)"""
+
+    def __init__(self, root: str, encoding: str = ENCODING_ZSTD):
+        super().__init__(encoding)
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split('/'))
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def iter_compressed(self, key: str) -> Iterator[bytes]:
+        try:
+            f = open(self._path(key), 'rb')
+        except FileNotFoundError:
+            raise ReportNotFoundError(key)
+        return self._read_chunks(f)
+
+    @staticmethod
+    def _read_chunks(f) -> Iterator[bytes]:
+        with f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3ReportStore(ReportStore):
+    """Reports stored in an S3-compatible bucket (AWS S3, MinIO, ...)"""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "reports/",
+        endpoint_url: Optional[str] = None,
+        encoding: str = ENCODING_ZSTD,
+    ):
+        if boto3 is None:
+            raise RuntimeError("boto3 is required for the S3 report store")
+        super().__init__(encoding)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def _write(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def iter_compressed(self, key: str) -> Iterator[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.NoSuchKey:
+            raise ReportNotFoundError(key)
+        return response["Body"].iter_chunks(CHUNK_SIZE)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+_store: Optional[ReportStore] = None
+
+
+def get_report_store() -> ReportStore:
+    """Return the report store configured in Settings"""
+    global _store
+    if _store is None:
+        if settings.REPORT_STORE_BACKEND == "s3":
+            _store = S3ReportStore(
+                bucket=settings.REPORT_STORE_S3_BUCKET,
+                prefix=settings.REPORT_STORE_S3_PREFIX,
+                endpoint_url=settings.REPORT_STORE_S3_ENDPOINT_URL,
+                encoding=settings.REPORT_STORE_COMPRESSION
+            )
+        else:
+            _store = LocalReportStore(
+                settings.REPORT_STORE_PATH,
+                encoding=settings.REPORT_STORE_COMPRESSION
+            )
+    return _store
@@ -0,0 +1,79 @@
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional
+import logging
+
+import redis
+
+from app.config.setting import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AuditResultCache:
+    """Maps an audit fingerprint to the id of a completed AuditResult.
+
+    The fingerprint covers the page URL, device type, Lighthouse
+    configuration and page content (body hash, or ETag if no body was read),
+    so a hit means Lighthouse would be run again on the same page with the
+    same settings. Entries expire after the TTL, which bounds how stale a
+    reused result can be; Redis evicts expired keys on its own. Like the
+    progress counters, the cache is advisory: Redis errors are logged and
+    treated as misses.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None, ttl_seconds: int = 86400):
+        self.redis = client or redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379")
+        )
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def key(page_url: str, device_type: str, config_fingerprint: str, content_fingerprint: str) -> str:
+        digest = hashlib.sha256(
+            '\n'.join([page_url, device_type, config_fingerprint, content_fingerprint]).encode('utf-8')
+        ).hexdigest()
+        return f"audit:cache:{digest}"
+
+    def get_many(self, keys: List[str]) -> List[Optional[int]]:
+        """Return the cached audit result id for each key, or None on a miss"""
+        if not keys:
+            return []
+        try:
+            values = self.redis.mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"Could not read audit result cache: {e}")
+            return [None] * len(keys)
+        return [int(value) if value is not None else None for value in values]
+
+    def put_many(self, entries: Dict[str, int]):
+        """Remember freshly completed audits under their fingerprints"""
+        if not entries or self.ttl_seconds <= 0:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, audit_result_id in entries.items():
+                pipe.set(key, audit_result_id, ex=self.ttl_seconds)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not update audit result cache: {e}")
+
+    def evict(self, keys: Iterable[str]):
+        """Drop entries whose audit result can no longer be reused"""
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            self.redis.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Could not evict audit result cache entries: {e}")
+
+
+_cache: Optional[AuditResultCache] = None
+
+
+def get_result_cache() -> AuditResultCache:
+    global _cache
+    if _cache is None:
+        _cache = AuditResultCache(ttl_seconds=settings.AUDIT_CACHE_TTL_SECONDS)
+    return _cache
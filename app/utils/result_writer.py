@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Optional
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.core_model import AuditMetrics, AuditResult
+
+logger = logging.getLogger(__name__)
+
+# Buffered audits before the writer flushes on its own
+DEFAULT_FLUSH_SIZE = 50
+
+
+class ResultWriter:
+    """Buffers audit result updates and metrics rows and writes them in bulk.
+
+    Updates are keyed by audit result id and sent as one executemany UPDATE,
+    which the worker engine pages with psycopg2's execute_batch, metrics as
+    one multi-row INSERT, followed by a single commit, so a batch of audits
+    costs a couple of round trips instead of several per page.
+    """
+
+    def __init__(self, db: Session, flush_size: int = DEFAULT_FLUSH_SIZE):
+        self.db = db
+        self.flush_size = max(1, flush_size)
+        self._updates: List[Dict[str, Any]] = []
+        self._metrics: List[Dict[str, Any]] = []
+        self.written = 0
+
+    def add(self, audit_id: int, fields: Dict[str, Any], metrics: Optional[Dict[str, Any]] = None):
+        """Queue new column values (and optionally a metrics row) for an audit result"""
+        self._updates.append({"id": audit_id, **fields})
+        if metrics is not None:
+            self._metrics.append({"audit_result_id": audit_id, **metrics})
+        self._maybe_flush()
+
+    def add_metrics(self, audit_id: int, metrics: Dict[str, Any]):
+        """Queue only a metrics row, e.g. when backfilling older audits"""
+        self._metrics.append({"audit_result_id": audit_id, **metrics})
+        self._maybe_flush()
+
+    def __len__(self) -> int:
+        return max(len(self._updates), len(self._metrics))
+
+    def _maybe_flush(self):
+        if len(self) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered in one transaction"""
+        if not self._updates and not self._metrics:
+            return
+        try:
+            if self._updates:
+                # Bulk UPDATE by primary key; rows with the same keys share one executemany
+                self.db.execute(update(AuditResult), self._updates)
+            if self._metrics:
+                self.db.execute(
+                    pg_insert(AuditMetrics).on_conflict_do_nothing(
+                        index_elements=[AuditMetrics.audit_result_id]
+                    ),
+                    self._metrics
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.written += len(self)
+        self._updates = []
+        self._metrics = []
@@ -0,0 +1,131 @@
+import aiohttp
+import zlib
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from typing import AsyncIterator, List, Optional, Set
+from xml.etree.ElementTree import XMLPullParser, ParseError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sitemap protocol caps a single file at 50MB uncompressed
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class SitemapDiscovery:
+    """Discover pages from robots.txt and the sitemaps it references"""
+
+    def __init__(self, base_url: str, user_agent: str = "*", max_sitemaps: int = 50):
+        self.base_url = base_url
+        self.user_agent = user_agent
+        self.max_sitemaps = max_sitemaps
+        parsed = urlparse(base_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.robots: Optional[RobotFileParser] = None
+        self.sitemap_urls: List[str] = []
+
+    async def load_robots(self, session: aiohttp.ClientSession):
+        """Fetch and parse robots.txt, collecting any Sitemap entries"""
+        robots_url = urljoin(self.origin, "/robots.txt")
+        self.robots = RobotFileParser(robots_url)
+
+        try:
+            async with session.get(robots_url) as response:
+                if response.status in (401, 403):
+                    self.robots.disallow_all = True
+                elif response.status >= 400:
+                    self.robots.allow_all = True
+                else:
+                    text = await response.text(errors='replace')
+                    self.robots.parse(text.splitlines())
+        except Exception as e:
+            logger.warning(f"Could not fetch {robots_url}: {e}")
+            self.robots.allow_all = True
+
+        self.sitemap_urls = list(self.robots.site_maps() or [])
+        if not self.sitemap_urls:
+            # Fall back to the conventional location
+            self.sitemap_urls = [urljoin(self.origin, "/sitemap.xml")]
+
+    def can_fetch(self, url: str) -> bool:
+        """Check a URL against the loaded robots.txt rules"""
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(self.user_agent, url)
+
+    def crawl_delay(self) -> Optional[float]:
+        """Return the Crawl-delay declared for our user agent, if any"""
+        if self.robots is None:
+            return None
+        delay = self.robots.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    async def iter_urls(self, session: aiohttp.ClientSession) -> AsyncIterator[str]:
+        """Yield page URLs from all sitemaps, following sitemap indexes"""
+        if self.robots is None:
+            await self.load_robots(session)
+
+        pending = list(self.sitemap_urls)
+        seen: Set[str] = set()
+
+        while pending and len(seen) < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            async for kind, loc in self._parse_sitemap(session, sitemap_url):
+                if kind == "sitemap":
+                    pending.append(loc)
+                elif self.can_fetch(loc):
+                    yield loc
+
+    async def _parse_sitemap(self, session: aiohttp.ClientSession, sitemap_url: str):
+        """Stream a (possibly gzipped) sitemap, yielding ("sitemap"|"page", loc)"""
+        parser = XMLPullParser(events=("start", "end"))
+        decompressor = None
+        received = 0
+        root_tag = None
+
+        try:
+            async with session.get(sitemap_url) as response:
+                if response.status != 200:
+                    return
+
+                first = True
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    if first:
+                        # .xml.gz files are served as-is, without Content-Encoding
+                        if chunk.startswith(GZIP_MAGIC):
+                            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        first = False
+
+                    if decompressor is not None:
+                        chunk = decompressor.decompress(chunk, MAX_SITEMAP_BYTES - received)
+                    received += len(chunk)
+                    parser.feed(chunk)
+
+                    for event, element in parser.read_events():
+                        tag = element.tag.rsplit('}', 1)[-1]
+                        if event == "start":
+                            if root_tag is None:
+                                root_tag = tag
+                            continue
+
+                        if tag == "loc" and element.text:
+                            kind = "sitemap" if root_tag == "sitemapindex" else "page"
+                            yield kind, element.text.strip()
+                        elif tag in ("url", "sitemap"):
+                            # Drop finished entries to keep memory flat
+                            element.clear()
+
+                    if received >= MAX_SITEMAP_BYTES:
+                        logger.warning(f"Sitemap {sitemap_url} exceeds size cap, truncating")
+                        break
+
+        except ParseError as e:
+            logger.warning(f"Malformed sitemap {sitemap_url}: {e}")
+        except Exception as e:
+            logger.error(f"Error fetching sitemap {sitemap_url}: {e}")
@@ -0,0 +1,101 @@
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+_NUMERIC = re.compile(r'^\d+$')
+_IDENTIFIER = re.compile(r'^(?=.*\d)[0-9a-fA-F-]{8,}$')
+_EXTENSION = re.compile(r'(\.[A-Za-z0-9]{1,5})$')
+
+# Example URLs kept per template for the coverage report
+MAX_EXAMPLES = 3
+
+
+def url_shape(url: str) -> str:
+    """Reduce a URL to its pattern, e.g. /products/blue-shirt-42 -> /products/{slug}.
+
+    The first path segment is kept literally since it usually names the
+    section; deeper segments become {n} (numbers), {id} (hex/uuid-like) or
+    {slug}, keeping any file extension. Query parameter names are kept,
+    their values are not.
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+
+    shape = []
+    for index, segment in enumerate(segments):
+        if _NUMERIC.match(segment):
+            shape.append('{n}')
+        elif _IDENTIFIER.match(segment):
+            shape.append('{id}')
+        elif index == 0:
+            shape.append(segment.lower())
+        else:
+            extension = _EXTENSION.search(segment)
+            shape.append('{slug}' + (extension.group(1).lower() if extension else ''))
+
+    pattern = '/' + '/'.join(shape)
+    params = sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    if params:
+        pattern += '?' + '&'.join(f"{name}=" for name in params)
+    return pattern
+
+
+def template_key(url: str, structure_fingerprint: Optional[str]) -> str:
+    """Cluster key for a page: its URL pattern plus its DOM skeleton fingerprint"""
+    return f"{url_shape(url)}|{structure_fingerprint or '-'}"
+
+
+class TemplateSampler:
+    """Streams crawled pages into template clusters and picks representatives.
+
+    Pages are clustered on URL pattern and DOM structure fingerprint, both
+    available as soon as the crawler has fetched a page, so the decision to
+    audit a page is made while the crawl is still running. The first
+    per_template pages of each cluster are audited; crawl order is
+    breadth-first, so representatives tend to be the shallowest pages.
+    """
+
+    def __init__(self, per_template: int = 1):
+        self.per_template = max(1, per_template)
+        self.templates: Dict[str, Dict[str, Any]] = OrderedDict()
+        self.page_templates: Dict[str, str] = {}
+
+    def offer(self, url: str, page_state: Optional[Dict[str, Any]]) -> bool:
+        """Record a page and return True if it should be audited"""
+        key = template_key(url, (page_state or {}).get('structure_hash'))
+        self.page_templates[url] = key
+
+        template = self.templates.get(key)
+        if template is None:
+            template = {"pattern": url_shape(url), "pages": 0, "sampled": 0, "examples": []}
+            self.templates[key] = template
+
+        template["pages"] += 1
+        if template["sampled"] >= self.per_template:
+            return False
+        template["sampled"] += 1
+        if len(template["examples"]) < MAX_EXAMPLES:
+            template["examples"].append(url)
+        return True
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-template page and sample counts, for the run's coverage report"""
+        return {
+            key: {
+                **template,
+                "coverage": round(template["sampled"] / template["pages"], 4),
+            }
+            for key, template in self.templates.items()
+        }
+
+    @property
+    def sampled_pages(self) -> int:
+        return sum(template["sampled"] for template in self.templates.values())
+
+    @property
+    def total_pages(self) -> int:
+        return sum(template["pages"] for template in self.templates.values())
+
+    def templates_for(self, page_urls: List[str]) -> Dict[str, str]:
+        return {url: self.page_templates[url] for url in page_urls if url in self.page_templates}
@@ -0,0 +1,68 @@
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Iterable, List, Optional
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_PERCENT_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+_UNRESERVED = set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+
+def normalize_url(url: str, allowed_params: Optional[Iterable[str]] = None) -> str:
+    """Canonicalize a URL so aliases of the same page compare equal.
+
+    Lowercases scheme and host, drops default ports, userinfo and the
+    fragment, resolves dot segments, normalizes percent-escapes and strips
+    the trailing slash. Only query parameters named in allowed_params are
+    kept (sorted); by default the query is dropped entirely.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+
+    path = _normalize_path(parts.path)
+    query = _filter_query(parts.query, allowed_params)
+
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def _normalize_path(path: str) -> str:
+    path = _PERCENT_ESCAPE.sub(_normalize_escape, path)
+
+    segments: List[str] = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if segments:
+                segments.pop()
+        elif segment and segment != '.':
+            segments.append(segment)
+
+    return '/' + '/'.join(segments)
+
+
+def _normalize_escape(match: re.Match) -> str:
+    char = chr(int(match.group(1), 16))
+    if char in _UNRESERVED:
+        return char
+    return '%' + match.group(1).upper()
+
+
+def _filter_query(query: str, allowed_params: Optional[Iterable[str]]) -> str:
+    if not query or not allowed_params:
+        return ''
+
+    allowed = set(allowed_params)
+    params = [
+        (key, value)
+        for key, value in parse_qsl(query, keep_blank_values=True)
+        if key in allowed
+    ]
+    return urlencode(sorted(params))
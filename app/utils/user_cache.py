@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from app.config.setting import settings
+
+
+class UserCache:
+    """In-process LRU of token subject (email) to the authenticated user.
+
+    Saves the User SELECT that get_current_user would otherwise run on
+    every request. Entries live for ttl_seconds at most, so a change made
+    by another API process is picked up within that time; changes made in
+    this process invalidate the entry straight away. Cached users are
+    detached from any session and must be treated as read-only.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return user
+
+    def put(self, email: str, user: Any):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: Optional[str]):
+        if email is None:
+            return
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    global _cache
+    if _cache is None:
+        _cache = UserCache(
+            ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+            max_size=settings.AUTH_USER_CACHE_SIZE
+        )
+    return _cache
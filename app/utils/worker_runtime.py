@@ -0,0 +1,134 @@
+import aiohttp
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Dict, Optional
+import logging
+
+from app.config.setting import settings
+from app.utils.crawler import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+# How long an interrupted task waits for its coroutine to clean up
+CANCEL_GRACE_SECONDS = 10
+SHUTDOWN_TIMEOUT_SECONDS = 10
+
+
+class WorkerRuntime:
+    """One long-lived event loop per worker process, running in its own thread.
+
+    Celery tasks are synchronous, so they hand coroutines to run(), which
+    blocks until the coroutine finishes. Keeping the loop alive across tasks
+    lets loop-bound resources outlive a single task: the shared HTTP session
+    keeps its keep-alive connections and DNS cache, and the Chrome pool's
+    asyncio primitives stay valid.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._thread = threading.Thread(
+            target=self._run_loop, name="worker-event-loop", daemon=True
+        )
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """Run a coroutine on the worker loop and wait for its result.
+
+        If the calling thread is interrupted (e.g. SoftTimeLimitExceeded), the
+        coroutine is cancelled and given a chance to kill its subprocesses and
+        remove temp files before the exception propagates.
+        """
+        if threading.current_thread() is self._thread:
+            # A task run eagerly (task_always_eager) from inside another task's
+            # coroutine; waiting on our own loop would deadlock, so use a private one
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(asyncio.run, coro).result()
+
+        result: concurrent.futures.Future = concurrent.futures.Future()
+        handle: Dict[str, asyncio.Task] = {}
+
+        def copy_result(task: asyncio.Task):
+            if task.cancelled():
+                result.cancel()
+            elif task.exception() is not None:
+                result.set_exception(task.exception())
+            else:
+                result.set_result(task.result())
+
+        def start():
+            task = self.loop.create_task(coro)
+            task.add_done_callback(copy_result)
+            handle["task"] = task
+
+        self.loop.call_soon_threadsafe(start)
+        try:
+            return result.result()
+        except BaseException:
+            if not result.done():
+                self.loop.call_soon_threadsafe(lambda: handle["task"].cancel())
+                concurrent.futures.wait([result], timeout=CANCEL_GRACE_SECONDS)
+            raise
+
+    async def http_session(self) -> aiohttp.ClientSession:
+        """Return the process-wide HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_LIMIT,
+                limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.HTTP_REQUEST_TIMEOUT_SECONDS),
+                headers={"User-Agent": USER_AGENT}
+            )
+        return self._session
+
+    async def _close_session(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def close(self):
+        """Close the HTTP session and stop the loop"""
+        if not self.loop.is_running():
+            return
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._close_session(), self.loop)
+            future.result(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Could not close worker HTTP session cleanly: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+_runtime: Optional[WorkerRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_worker_runtime() -> WorkerRuntime:
+    """Return this process's runtime, creating it on first use (and after fork)"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None or _runtime.pid != os.getpid():
+            _runtime = WorkerRuntime()
+        return _runtime
+
+
+def close_worker_runtime():
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None and _runtime.pid == os.getpid():
+            _runtime.close()
+        _runtime = None
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Stand-in for the Lighthouse CLI that writes a realistic report without Chrome.
+
+Accepts the same arguments LighthouseRunner passes, sleeps to simulate the
+audit, and writes a report shaped like Lighthouse 10's JSON output to
+--output-path (stdout if not given). Behaviour is controlled through the
+environment:
+
+    FAKE_LIGHTHOUSE_DELAY_MS   simulated audit time (default 500)
+    FAKE_LIGHTHOUSE_JITTER_MS  random extra time up to this much (default 0)
+    FAKE_LIGHTHOUSE_REPORT_KB  approximate report size (default 300)
+    FAKE_LIGHTHOUSE_FAIL_RATE  fraction of runs that exit non-zero (default 0)
+
+Scores and metrics are derived from the URL, so repeated audits of a page
+agree. Only the standard library is used, to keep process start-up cheap.
+"""
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+CATEGORIES = {
+    "performance": ["first-contentful-paint", "largest-contentful-paint", "total-blocking-time", "cumulative-layout-shift", "speed-index"],
+    "accessibility": ["color-contrast", "image-alt", "document-title", "html-has-lang"],
+    "best-practices": ["is-on-https", "errors-in-console", "deprecations"],
+    "seo": ["meta-description", "http-status-code", "link-text", "crawlable-anchors"],
+}
+
+RESOURCE_TYPES = ["document", "script", "stylesheet", "image", "font", "media", "other"]
+
+
+def _parse_args(argv):
+    url, output_path, form_factor = None, None, "desktop"
+    for arg in argv:
+        if arg.startswith("--output-path="):
+            output_path = arg.split("=", 1)[1]
+        elif arg.startswith("--emulated-form-factor="):
+            form_factor = arg.split("=", 1)[1]
+        elif not arg.startswith("-") and url is None:
+            url = arg
+    return url, output_path, form_factor
+
+
+def _audit(audit_id, score, numeric_value=None, unit=None, details=None):
+    audit = {
+        "id": audit_id,
+        "title": audit_id.replace("-", " ").capitalize(),
+        "description": f"Synthetic result for {audit_id}.",
+        "score": score,
+        "scoreDisplayMode": "numeric" if numeric_value is not None else "binary",
+    }
+    if numeric_value is not None:
+        audit["numericValue"] = numeric_value
+        audit["numericUnit"] = unit or "millisecond"
+        audit["displayValue"] = f"{numeric_value:,.1f}"
+    if details is not None:
+        audit["details"] = details
+    return audit
+
+
+def build_report(url, form_factor, report_kb):
+    rng = random.Random(hashlib.sha256(f"{url}|{form_factor}".encode()).digest())
+    slowdown = 2.5 if form_factor == "mobile" else 1.0
+
+    requests = []
+    for index in range(rng.randint(20, 80)):
+        resource_type = rng.choice(RESOURCE_TYPES)
+        requests.append({
+            "url": f"{url.rstrip('/')}/static/{resource_type}-{index}",
+            "resourceType": resource_type,
+            "transferSize": rng.randint(300, 250000),
+            "resourceSize": rng.randint(300, 600000),
+            "startTime": round(rng.uniform(0, 3000) * slowdown, 1),
+            "endTime": round(rng.uniform(3000, 6000) * slowdown, 1),
+            "statusCode": 200,
+            "mimeType": "application/octet-stream",
+        })
+    summary = {}
+    for request in requests:
+        item = summary.setdefault(request["resourceType"], {"resourceType": request["resourceType"], "label": request["resourceType"].title(), "requestCount": 0, "transferSize": 0})
+        item["requestCount"] += 1
+        item["transferSize"] += request["transferSize"]
+    total_bytes = sum(request["transferSize"] for request in requests)
+    summary_items = [{"resourceType": "total", "label": "Total", "requestCount": len(requests), "transferSize": total_bytes}]
+    summary_items += list(summary.values())
+    summary_items.append({"resourceType": "third-party", "label": "Third-party", "requestCount": rng.randint(0, 10), "transferSize": rng.randint(0, 200000)})
+
+    audits = {
+        "first-contentful-paint": _audit("first-contentful-paint", round(rng.uniform(0.5, 1), 2), rng.uniform(600, 2500) * slowdown),
+        "largest-contentful-paint": _audit("largest-contentful-paint", round(rng.uniform(0.3, 1), 2), rng.uniform(1000, 4500) * slowdown),
+        "total-blocking-time": _audit("total-blocking-time", round(rng.uniform(0.3, 1), 2), rng.uniform(0, 900) * slowdown),
+        "cumulative-layout-shift": _audit("cumulative-layout-shift", round(rng.uniform(0.5, 1), 2), rng.uniform(0, 0.3), "unitless"),
+        "speed-index": _audit("speed-index", round(rng.uniform(0.4, 1), 2), rng.uniform(1000, 5000) * slowdown),
+        "interactive": _audit("interactive", round(rng.uniform(0.4, 1), 2), rng.uniform(1500, 7000) * slowdown),
+        "total-byte-weight": _audit("total-byte-weight", round(rng.uniform(0.5, 1), 2), float(total_bytes), "byte"),
+        "resource-summary": _audit("resource-summary", None, details={"type": "table", "items": summary_items}),
+        "network-requests": _audit("network-requests", None, details={"type": "table", "items": requests}),
+    }
+    for audit_ids in CATEGORIES.values():
+        for audit_id in audit_ids:
+            audits.setdefault(audit_id, _audit(audit_id, rng.choice([0, 1, 1, 1])))
+
+    categories = {
+        category_id: {
+            "id": category_id,
+            "title": category_id.replace("-", " ").title(),
+            "score": round(rng.uniform(0.4, 1.0), 2),
+            "auditRefs": [{"id": audit_id, "weight": 1} for audit_id in audit_ids],
+        }
+        for category_id, audit_ids in CATEGORIES.items()
+    }
+
+    report = {
+        "lighthouseVersion": "10.4.0",
+        "requestedUrl": url,
+        "mainDocumentUrl": url,
+        "finalDisplayedUrl": url,
+        "finalUrl": url,
+        "fetchTime": datetime.now(timezone.utc).isoformat(),
+        "userAgent": "Mozilla/5.0 (fake-lighthouse)",
+        "environment": {"benchmarkIndex": 1500},
+        "configSettings": {"formFactor": form_factor, "throttlingMethod": "simulate"},
+        "categories": categories,
+        "audits": audits,
+        "timing": {"total": 0},
+    }
+
+    # Real reports are dominated by screenshots and diagnostics; pad up to the target size
+    padding_bytes = int(report_kb * 1024) - len(json.dumps(report))
+    if padding_bytes > 0:
+        frames = []
+        while padding_bytes > 0:
+            data = base64.b64encode(rng.randbytes(min(padding_bytes, 8192) * 3 // 4 + 1)).decode()
+            frames.append({"timing": len(frames) * 300, "timestamp": len(frames), "data": f"data:image/jpeg;base64,{data}"})
+            padding_bytes -= len(data) + 80
+        audits["screenshot-thumbnails"] = _audit("screenshot-thumbnails", None, details={"type": "filmstrip", "items": frames})
+    return report
+
+
+def main(argv):
+    url, output_path, form_factor = _parse_args(argv)
+    if not url:
+        print("fake-lighthouse: no URL given", file=sys.stderr)
+        return 1
+
+    delay = float(os.getenv("FAKE_LIGHTHOUSE_DELAY_MS", "500"))
+    jitter = float(os.getenv("FAKE_LIGHTHOUSE_JITTER_MS", "0"))
+    time.sleep((delay + random.uniform(0, jitter)) / 1000)
+
+    if random.random() < float(os.getenv("FAKE_LIGHTHOUSE_FAIL_RATE", "0")):
+        print(f"fake-lighthouse: simulated failure for {url}", file=sys.stderr)
+        return 1
+
+    report = build_report(url, form_factor, float(os.getenv("FAKE_LIGHTHOUSE_REPORT_KB", "300")))
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f)
+    else:
+        json.dump(report, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
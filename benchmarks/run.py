@@ -0,0 +1,364 @@
+"""Offline throughput benchmark for the crawler, Lighthouse runner, Celery tasks and API.
+
+Everything runs against a synthetic website served locally, with a fake
+`lighthouse` executable on PATH, so results depend only on this code and
+the machine. Run from the repository root:
+
+    python -m benchmarks.run                             # crawl + lighthouse
+    python -m benchmarks.run --scenarios crawl,lighthouse,tasks,api
+    python -m benchmarks.run --save-baseline             # record a new baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+The tasks and api scenarios need DATABASE_URL (a scratch database with the
+migrations applied) and REDIS_URL. Tasks run with Celery in eager mode, so
+no broker or worker is involved. Exit status is 1 when a metric is worse
+than the baseline by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import stat
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.site_server import SiteServer, SyntheticSite
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+ALL_SCENARIOS = ["crawl", "lighthouse", "tasks", "api"]
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its largest finished child"""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def install_fake_lighthouse(directory: str, args: argparse.Namespace):
+    """Put a `lighthouse` wrapper for fake_lighthouse.py first on PATH"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_lighthouse.py")
+    wrapper = os.path.join(directory, "lighthouse")
+    with open(wrapper, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+    os.chmod(wrapper, os.stat(wrapper).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    os.environ["PATH"] = directory + os.pathsep + os.environ.get("PATH", "")
+    os.environ["FAKE_LIGHTHOUSE_DELAY_MS"] = str(args.lighthouse_delay_ms)
+    os.environ["FAKE_LIGHTHOUSE_JITTER_MS"] = str(args.lighthouse_jitter_ms)
+    os.environ["FAKE_LIGHTHOUSE_REPORT_KB"] = str(args.report_kb)
+    os.environ["FAKE_LIGHTHOUSE_FAIL_RATE"] = str(args.lighthouse_fail_rate)
+
+
+def bench_crawl(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.utils.crawler import WebsiteCrawler
+
+    crawler = WebsiteCrawler(
+        base_url,
+        max_pages=args.pages,
+        concurrency=args.crawl_concurrency,
+        per_host_limit=args.crawl_concurrency,
+        discovery_mode=args.discovery_mode
+    )
+    start = time.perf_counter()
+    pages = asyncio.run(crawler.crawl())
+    seconds = time.perf_counter() - start
+    return {
+        "pages": len(pages),
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(len(pages) / seconds, 2),
+    }
+
+
+def bench_lighthouse(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.utils.lighthouse_runner import LighthouseRunner
+
+    site = SyntheticSite(page_count=args.pages, fan_out=args.fan_out, max_depth=args.depth)
+    targets = [
+        (base_url + site.path(n % site.page_count), "mobile" if n % 2 else "desktop")
+        for n in range(args.audits)
+    ]
+
+    async def run():
+        runner = LighthouseRunner(use_chrome_pool=False)
+        reports = await runner.run_audits(targets)
+        # Parse work done by the worker for every report
+        for report in reports:
+            if report is not None:
+                runner.extract_scores(report)
+                runner.extract_metrics(report)
+        return reports
+
+    start = time.perf_counter()
+    reports = asyncio.run(run())
+    seconds = time.perf_counter() - start
+    completed = sum(1 for report in reports if report is not None)
+    return {
+        "audits": completed,
+        "failed": len(reports) - completed,
+        "seconds": round(seconds, 3),
+        "audits_per_sec": round(completed / seconds, 2),
+    }
+
+
+def bench_tasks(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from sqlalchemy import func
+    from app.config.base import WorkerSessionLocal
+    from app.config.celery_app import celery_app
+    from app.models.core_model import AuditResult
+    from app.routers.v1.audit.audit import audit_website
+
+    celery_app.conf.update(task_always_eager=True, task_eager_propagates=True)
+
+    start = time.perf_counter()
+    result = audit_website.apply(kwargs={
+        "website_url": base_url,
+        "website_name": "benchmark",
+        "include_mobile": args.mobile,
+        "include_desktop": True,
+        "max_pages": args.pages,
+        "discovery_mode": args.discovery_mode,
+        "force_refresh": True,
+    }).get()
+    seconds = time.perf_counter() - start
+    if result.get("status") != "success":
+        raise RuntimeError(f"audit_website failed: {result.get('message')}")
+
+    db = WorkerSessionLocal()
+    try:
+        counts = dict(
+            db.query(AuditResult.status, func.count(AuditResult.id))
+            .filter(AuditResult.run_id == result["run_id"])
+            .group_by(AuditResult.status)
+            .all()
+        )
+    finally:
+        db.close()
+
+    completed = counts.get("completed", 0)
+    return {
+        "website_id": result["website_id"],
+        "pages": result["pages_found"],
+        "audits": completed,
+        "failed": counts.get("failed", 0),
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(result["pages_found"] / seconds, 2),
+        "audits_per_sec": round(completed / seconds, 2),
+    }
+
+
+def bench_api(website_id: Optional[int], args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from app.config.base import async_engine
+    from app.main import app
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            target = website_id
+            if target is None:
+                websites = (await client.get("/api/v1/audit/websites")).json()
+                if not websites:
+                    raise RuntimeError("api scenario needs at least one audited website; run tasks first")
+                target = websites[0]["id"]
+
+            endpoints = {
+                "websites": "/api/v1/audit/websites",
+                "status": f"/api/v1/audit/audit/{target}/status",
+                "results": f"/api/v1/audit/audit/{target}/results?limit=50",
+                "metrics": f"/api/v1/audit/audit/{target}/metrics",
+            }
+            latencies: Dict[str, List[float]] = {name: [] for name in endpoints}
+            errors = 0
+            schedule = [name for _ in range(args.api_requests) for name in endpoints]
+            position = 0
+
+            async def worker():
+                nonlocal position, errors
+                while position < len(schedule):
+                    name = schedule[position]
+                    position += 1
+                    start = time.perf_counter()
+                    response = await client.get(endpoints[name])
+                    latencies[name].append((time.perf_counter() - start) * 1000)
+                    if response.status_code >= 400:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.api_concurrency)))
+            seconds = time.perf_counter() - start
+        await async_engine.dispose()
+        return latencies, errors, seconds, len(schedule)
+
+    latencies, errors, seconds, total = asyncio.run(run())
+    everything = [sample for samples in latencies.values() for sample in samples]
+    metrics: Dict[str, Any] = {
+        "requests": total,
+        "errors": errors,
+        "requests_per_sec": round(total / seconds, 2),
+        "p50_ms": round(percentile(everything, 0.5), 2),
+        "p99_ms": round(percentile(everything, 0.99), 2),
+    }
+    for name, samples in latencies.items():
+        metrics[f"{name}_p50_ms"] = round(percentile(samples, 0.5), 2)
+        metrics[f"{name}_p99_ms"] = round(percentile(samples, 0.99), 2)
+    return metrics
+
+
+def higher_is_better(metric: str) -> Optional[bool]:
+    """Direction of a metric for baseline comparison, None if it is not compared"""
+    if metric.endswith("_per_sec"):
+        return True
+    if metric.endswith("_ms") or metric.startswith("peak_rss"):
+        return False
+    return None
+
+
+def flatten(results: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    return {
+        f"{scenario}.{metric}": value
+        for scenario, metrics in results.items()
+        for metric, value in metrics.items()
+        if isinstance(value, (int, float)) and higher_is_better(metric) is not None
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print current vs. baseline for each comparable metric and return the regressions"""
+    current, previous = flatten(results["scenarios"]), flatten(baseline["scenarios"])
+    regressions = []
+    print(f"\n{'metric':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(current):
+        if name not in previous or not previous[name]:
+            print(f"{name:<36}{'-':>12}{current[name]:>12}")
+            continue
+        change = (current[name] - previous[name]) / previous[name]
+        better = higher_is_better(name.split(".", 1)[1])
+        regressed = change < -tolerance if better else change > tolerance
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<36}{previous[name]:>12}{current[name]:>12}{change:>+10.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scenarios", default="crawl,lighthouse", help=f"comma-separated, from {','.join(ALL_SCENARIOS)}")
+    site = parser.add_argument_group("synthetic site")
+    site.add_argument("--pages", type=int, default=200)
+    site.add_argument("--fan-out", type=int, default=5)
+    site.add_argument("--depth", type=int, default=None)
+    site.add_argument("--latency-ms", type=float, default=20)
+    site.add_argument("--page-kb", type=float, default=20)
+    site.add_argument("--templates", type=int, default=3)
+    lighthouse = parser.add_argument_group("fake lighthouse")
+    lighthouse.add_argument("--lighthouse-delay-ms", type=float, default=300)
+    lighthouse.add_argument("--lighthouse-jitter-ms", type=float, default=100)
+    lighthouse.add_argument("--report-kb", type=float, default=300)
+    lighthouse.add_argument("--lighthouse-fail-rate", type=float, default=0)
+    run = parser.add_argument_group("workload")
+    run.add_argument("--discovery-mode", default="links")
+    run.add_argument("--crawl-concurrency", type=int, default=10)
+    run.add_argument("--audits", type=int, default=40, help="audits for the lighthouse scenario")
+    run.add_argument("--lighthouse-concurrency", type=int, default=None, help="override LIGHTHOUSE_MAX_CONCURRENCY")
+    run.add_argument("--mobile", action="store_true", help="audit mobile as well as desktop in the tasks scenario")
+    run.add_argument("--rate-limit", action="store_true", help="keep the per-origin rate limiter on (needs Redis)")
+    run.add_argument("--api-requests", type=int, default=50, help="rounds over the api endpoints")
+    run.add_argument("--api-concurrency", type=int, default=10)
+    run.add_argument("--website-id", type=int, default=None, help="website for the api scenario")
+    output = parser.add_argument_group("results")
+    output.add_argument("--baseline", default=DEFAULT_BASELINE)
+    output.add_argument("--save-baseline", action="store_true")
+    output.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    output.add_argument("--output", default=None, help="also write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(ALL_SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    from app.config.setting import settings
+    if not args.rate_limit:
+        # Otherwise the limiter, not the code under test, sets the pace on one local origin
+        settings.ORIGIN_RATE_LIMIT_PER_SECOND = 0
+    if args.lighthouse_concurrency is not None:
+        settings.LIGHTHOUSE_MAX_CONCURRENCY = args.lighthouse_concurrency
+
+    site = SyntheticSite(
+        page_count=args.pages,
+        fan_out=args.fan_out,
+        max_depth=args.depth,
+        latency_ms=args.latency_ms,
+        page_kb=args.page_kb,
+        templates=args.templates
+    )
+    results: Dict[str, Any] = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline", "output")},
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory() as bin_dir, SiteServer(site) as server:
+        install_fake_lighthouse(bin_dir, args)
+        benches: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "crawl": lambda: bench_crawl(server.base_url, args),
+            "lighthouse": lambda: bench_lighthouse(server.base_url, args),
+            "tasks": lambda: bench_tasks(server.base_url, args),
+            "api": lambda: bench_api(
+                args.website_id or results["scenarios"].get("tasks", {}).get("website_id"), args
+            ),
+        }
+        for name in scenarios:
+            print(f"Running {name}...", file=sys.stderr)
+            results["scenarios"][name] = benches[name]()
+            print(json.dumps(results["scenarios"][name]), file=sys.stderr)
+        results["site_requests"] = server.requests
+
+    rss = peak_rss_mb()
+    results["scenarios"]["process"] = {"peak_rss_mb": rss["self"], "peak_rss_children_mb": rss["children"]}
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("\nWarning: baseline was recorded with different settings", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
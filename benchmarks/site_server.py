@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import random
+import re
+import threading
+from typing import List, Optional
+
+from aiohttp import web
+
+SECTIONS = ["products", "blog", "docs", "help", "news"]
+
+_PAGE_PATH = re.compile(r'^/[a-z]+/[a-z]+-(\d+)$')
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud"
+).split()
+
+
+class SyntheticSite:
+    """A generated website: page n links to pages n*fan_out+1 .. n*fan_out+fan_out.
+
+    Pages form a tree of the given fan-out, cut off at page_count pages or
+    max_depth levels. Each page also links back to the home page and its
+    parent, so the crawler has duplicates to skip. Pages are spread over
+    several sections, each with its own URL pattern and DOM skeleton, so
+    template sampling sees realistic clusters.
+    """
+
+    def __init__(
+        self,
+        page_count: int = 200,
+        fan_out: int = 5,
+        max_depth: Optional[int] = None,
+        latency_ms: float = 0,
+        page_kb: float = 20,
+        templates: int = 3,
+        seed: int = 0,
+    ):
+        self.fan_out = max(1, fan_out)
+        self.latency_ms = latency_ms
+        self.page_kb = page_kb
+        self.templates = max(1, min(templates, len(SECTIONS)))
+        self.seed = seed
+        self.page_count = min(max(1, page_count), self._tree_size(max_depth))
+
+    def _tree_size(self, max_depth: Optional[int]) -> int:
+        if max_depth is None:
+            return 1 << 62
+        size, level = 0, 1
+        for _ in range(max_depth + 1):
+            size += level
+            level *= self.fan_out
+        return size
+
+    def path(self, n: int) -> str:
+        if n == 0:
+            return "/"
+        return f"/{SECTIONS[n % self.templates]}/item-{n}"
+
+    def page_number(self, path: str) -> Optional[int]:
+        if path == "/":
+            return 0
+        match = _PAGE_PATH.match(path)
+        if not match:
+            return None
+        n = int(match.group(1))
+        return n if 0 < n < self.page_count and path == self.path(n) else None
+
+    def children(self, n: int) -> List[int]:
+        first = n * self.fan_out + 1
+        return [child for child in range(first, first + self.fan_out) if child < self.page_count]
+
+    def render(self, n: int) -> str:
+        links = [0] + ([(n - 1) // self.fan_out] if n else []) + self.children(n)
+        nav = "".join(f'<li><a href="{self.path(link)}">Page {link}</a></li>' for link in links)
+
+        # Filler text, deterministic per page so ETags and content hashes are stable
+        rng = random.Random(self.seed * 1000003 + n)
+        paragraphs = []
+        size = 0
+        while size < self.page_kb * 1024:
+            paragraph = "<p>" + " ".join(rng.choice(_WORDS) for _ in range(60)) + "</p>"
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+        body = "".join(paragraphs)
+
+        section = SECTIONS[n % self.templates] if n else "home"
+        if section == "products":
+            main = f'<div class="product"><div class="gallery"><img src="/img/{n}.png" alt=""></div><div class="details">{body}</div></div>'
+        elif section == "blog":
+            main = f'<article class="post"><header><h1>Post {n}</h1></header><section>{body}</section><footer class="comments"></footer></article>'
+        else:
+            main = f'<main class="{section}"><h1>{section.title()} {n}</h1>{body}</main>'
+
+        return (
+            f'<!DOCTYPE html><html><head><title>Page {n}</title>'
+            f'<link rel="canonical" href="{self.path(n)}"></head>'
+            f'<body><nav><ul>{nav}</ul></nav>{main}</body></html>'
+        )
+
+    def sitemap(self, base_url: str) -> str:
+        urls = "".join(
+            f"<url><loc>{base_url}{self.path(n)}</loc></url>" for n in range(self.page_count)
+        )
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+class SiteServer:
+    """Serves a SyntheticSite over HTTP from its own thread and event loop.
+
+    The server gets its own loop so it keeps answering while the caller
+    blocks, e.g. in a Celery task running eagerly.
+    """
+
+    def __init__(self, site: SyntheticSite, host: str = "127.0.0.1", port: int = 0):
+        self.site = site
+        self.host = host
+        self.port = port
+        self.base_url: Optional[str] = None
+        self.requests = 0
+        self._loop = asyncio.new_event_loop()
+        self._runner: Optional[web.AppRunner] = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="site-server", daemon=True)
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/robots.txt", self._robots)
+        app.router.add_get("/sitemap.xml", self._sitemap)
+        app.router.add_get("/{path:.*}", self._page)
+        return app
+
+    async def _delay(self):
+        self.requests += 1
+        if self.site.latency_ms > 0:
+            await asyncio.sleep(self.site.latency_ms / 1000)
+
+    async def _robots(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.Response(text=f"User-agent: *\nAllow: /\nSitemap: {self.base_url}/sitemap.xml\n")
+
+    async def _sitemap(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.Response(text=self.site.sitemap(self.base_url), content_type="application/xml")
+
+    async def _page(self, request: web.Request) -> web.Response:
+        await self._delay()
+        n = self.site.page_number(request.path)
+        if n is None:
+            raise web.HTTPNotFound()
+        etag = '"' + hashlib.sha1(f"{self.site.seed}:{n}".encode()).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=self.site.render(n), content_type="text/html", headers={"ETag": etag})
+
+    async def _start(self):
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Start serving and return the site's base URL"""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.base_url
+
+    def stop(self):
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "SiteServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()